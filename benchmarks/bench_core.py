@@ -0,0 +1,205 @@
+"""benchmarks for the core engine in brick.base.
+
+generates synthetic blueprints of several sizes, with varied attr counts, Input chains and script sizes,
+and times the Builder and Block operations that scale with the number of blocks.
+
+usage:
+    python benchmarks/bench_core.py --output bench.json
+    python benchmarks/bench_core.py --sizes 10,1000 --compare bench.json --threshold 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brick import base, attr_type, lib
+
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+
+OPERATIONS = ('saveBlueprint', 'loadBlueprint', 'fastForward', 'getNextUniqueName', 'createBlock', 'ingestInputs',
+              'reset')
+
+# blocks created and removed again by the createBlock operation.
+CREATE_COUNT = 100
+
+# every nth block reads the previous block's output through an Input attr.
+INPUT_CHAIN_STEP = 3
+
+SCRIPT_PADDING_LINES = (0, 5, 50)
+
+
+def makeScript(index):
+    padding = SCRIPT_PADDING_LINES[index % len(SCRIPT_PADDING_LINES)]
+    lines = ['# synthetic script line {0}'.format(each) for each in range(padding)]
+    lines.append('value = {0}'.format(index % 7))
+    return '\n'.join(lines)
+
+
+def makeBuilder(size):
+    builder = base.GenericBuilder()
+    builder.setAttr('asset', (attr_type.String, 'bench'))
+    builder.setAttr('lod', (attr_type.Int, 0))
+
+    # named directly, the same names createBlock gives, so generating the blueprint is not what gets measured.
+    blockClass = lib.getBlockClassByName('ScriptBlock')
+    for index in range(size):
+        block = blockClass()
+        block.name = 'ScriptBlock{0}'.format(index) if index else 'ScriptBlock'
+        block.setAttr('script', (attr_type.Script, makeScript(index)))
+
+        for attrIndex in range(index % 5):
+            block.setAttr('extra{0}'.format(attrIndex), (attr_type.String, 'value{0}'.format(attrIndex)))
+        if index % 4 == 0:
+            block.setAttr('items', (attr_type.List, list(range(index % 10))))
+
+        if index and index % INPUT_CHAIN_STEP == 0:
+            previous = builder.blocks[index - 1]
+            block.setAttr('upstream', (attr_type.Input, (previous.name, 'value')))
+
+        builder.insertBlock(block)
+
+    return builder
+
+
+def timeIt(func, repeat):
+    best = None
+    for _ in range(repeat):
+        stime = time.time()
+        func()
+        elapsed = time.time() - stime
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchSize(size, workDir, repeat):
+    results = {}
+    blueprintPath = os.path.join(workDir, 'bench_{0}.bpt'.format(size))
+
+    builder = makeBuilder(size)
+
+    results['saveBlueprint'] = timeIt(lambda: builder.saveBlueprint(blueprintPath), repeat)
+    results['loadBlueprint'] = timeIt(lambda: base.GenericBuilder.loadBlueprint(blueprintPath), repeat)
+
+    builder = base.GenericBuilder.loadBlueprint(blueprintPath)
+
+    def fastForward():
+        builder.reset()
+        builder.fastForward()
+
+    results['fastForward'] = timeIt(fastForward, repeat)
+
+    # every block is named after its type, the unique name search has to skip the whole sequence.
+    results['getNextUniqueName'] = timeIt(lambda: builder.getNextUniqueName(blockType='ScriptBlock'), repeat)
+
+    def createBlock():
+        for _ in range(CREATE_COUNT):
+            builder.insertBlock(builder.createBlock('ScriptBlock'))
+        for _ in range(CREATE_COUNT):
+            builder.blocks.pop()
+
+    results['createBlock'] = timeIt(createBlock, repeat)
+
+    def ingestInputs():
+        for block in builder.blocks:
+            block.ingestInputs()
+
+    results['ingestInputs'] = timeIt(ingestInputs, repeat)
+    results['reset'] = timeIt(builder.reset, repeat)
+
+    return results
+
+
+def runBenchmarks(sizes, repeat=3):
+    workDir = tempfile.mkdtemp(prefix='brick_bench_')
+    try:
+        results = {}
+        for size in sizes:
+            sys.stderr.write('benchmarking {0} blocks...\n'.format(size))
+            results[str(size)] = benchSize(size, workDir, repeat)
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    return {'meta': {'python': platform.python_version(),
+                     'platform': platform.platform(),
+                     'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                     'repeat': repeat},
+            'results': results}
+
+
+def compare(current, baseline, threshold):
+    """
+    return a list of (size, operation, baseline, current, ratio) slower than baseline * threshold.
+    """
+    regressions = []
+    for size, operations in sorted(current['results'].items(), key=lambda item: int(item[0])):
+        baseOperations = baseline.get('results', {}).get(size)
+        if not baseOperations:
+            continue
+        for operation in OPERATIONS:
+            baseTime, currTime = baseOperations.get(operation), operations.get(operation)
+            if not baseTime or currTime is None:
+                continue
+            ratio = currTime / baseTime
+            if ratio > threshold:
+                regressions.append((size, operation, baseTime, currTime, ratio))
+    return regressions
+
+
+def printTable(data, baseline=None):
+    header = '{0:>8}  {1:<18} {2:>12}'.format('blocks', 'operation', 'seconds')
+    if baseline:
+        header += ' {0:>12} {1:>8}'.format('baseline', 'ratio')
+    print(header)
+
+    for size, operations in sorted(data['results'].items(), key=lambda item: int(item[0])):
+        for operation in OPERATIONS:
+            line = '{0:>8}  {1:<18} {2:>12.6f}'.format(size, operation, operations[operation])
+            baseTime = (baseline or {}).get('results', {}).get(size, {}).get(operation)
+            if baseTime:
+                line += ' {0:>12.6f} {1:>8.2f}'.format(baseTime, operations[operation] / baseTime)
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='brick core engine benchmarks')
+    parser.add_argument('--sizes', default=','.join(str(each) for each in DEFAULT_SIZES),
+                        help='comma separated block counts')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best one is kept')
+    parser.add_argument('--output', help='write results to this json file')
+    parser.add_argument('--compare', help='baseline json file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio over the baseline reported as a regression')
+    args = parser.parse_args(argv)
+
+    sizes = [int(each) for each in args.sizes.split(',') if each.strip()]
+    data = runBenchmarks(sizes, repeat=args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as fd:
+            json.dump(data, fd, indent=4, sort_keys=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as fd:
+            baseline = json.load(fd)
+
+    printTable(data, baseline)
+
+    if baseline:
+        regressions = compare(data, baseline, args.threshold)
+        for size, operation, baseTime, currTime, ratio in regressions:
+            print('REGRESSION {0} blocks {1}: {2:.6f}s -> {3:.6f}s ({4:.2f}x)'.format(
+                size, operation, baseTime, currTime, ratio))
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
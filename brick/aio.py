@@ -0,0 +1,131 @@
+"""asyncio execution mode.
+
+blocks can define ``async def _execute``. Builder.run_async awaits independent async blocks concurrently
+on the event loop, while synchronous blocks keep running one by one, in list order, on an executor thread.
+"""
+import asyncio
+from concurrent import futures
+
+from brick.constants import BuildStatus
+from brick.base import log
+from brick.lib import block_log
+from brick.executors import DependencyGraph, syncNextStep
+
+
+def runSync(coroutine):
+    """
+    run a coroutine to completion, for async blocks executed outside of an event loop.
+    """
+    return asyncio.run(coroutine)
+
+
+async def executeBlock(block, resolveInputs=True):
+    """
+    awaitable counterpart of Block.execute for async blocks.
+    """
+    # each task runs in its own context, so concurrent blocks capture into their own logs.
+    with block_log.capture(block.log):
+        try:
+            stime = block.startExecute(resolveInputs=resolveInputs)
+            await block._execute()
+            block.finishExecute(stime)
+        except Exception:
+            block.failExecute()
+
+
+class AsyncDependencyGraph(DependencyGraph):
+    """
+    dependency graph for the asyncio mode.
+
+    a synchronous block waits for every block before it, inputs or not, so synchronous blocks stay in order.
+    an async block waits for its inputs, or for the last synchronous block before it when it declares none.
+    """
+    def _build(self):
+        self._lastSync = None
+        self._sinceSync = set()
+        super(AsyncDependencyGraph, self)._build()
+
+    def _blockDeps(self, idx, block, inputDeps):
+        if block.isAsync():
+            if inputDeps is not None:
+                deps = set(inputDeps)
+            else:
+                deps = set() if self._lastSync is None else set([self._lastSync])
+            self._sinceSync.add(idx)
+            return deps
+
+        deps = self._sinceSync | set(inputDeps or ())
+        if self._lastSync is not None:
+            deps.add(self._lastSync)
+        self._lastSync = idx
+        self._sinceSync = set()
+        return deps
+
+
+async def runBuilder(builder, maxWorkers=None):
+    """
+    run the remaining blocks of a builder on the running event loop.
+
+    :param builder: Builder object
+    :param maxWorkers: number of executor threads for synchronous blocks. synchronous blocks never
+                       overlap each other, one thread is enough unless blocks with inputs fan out.
+    """
+    steps = list(builder.iterSteps())
+    if not steps:
+        return
+    nextSteps = [nextStep for nextStep, _ in steps]
+    blocks = [block for _, block in steps]
+
+    graph = AsyncDependencyGraph(blocks)
+    loop = asyncio.get_running_loop()
+    pool = futures.ThreadPoolExecutor(max_workers=maxWorkers or 1)
+    tasks = []
+
+    async def runOne(idx):
+        deps = graph.upstream[idx]
+        if deps:
+            await asyncio.gather(*[tasks[dep] for dep in deps])
+
+        block = blocks[idx]
+        for dep in graph.inputUpstream[idx]:
+            if not tasks[dep].result():
+                log.warning("{0}: skipped, an input block failed.".format(block.name))
+                return False
+
+        if block.isAsync():
+            tracer = builder.tracer
+            traceToken = tracer.begin(block, builder, push=False) if tracer is not None else None
+            try:
+                builder.applyGlobalAttrs(block)
+                if not builder.restoreCachedResults(block):
+                    await executeBlock(block)
+                    builder.storeCachedResults(block)
+                builder.blockFinished(block, nextSteps[idx])
+            finally:
+                if traceToken is not None:
+                    tracer.end(traceToken, block)
+        else:
+            await loop.run_in_executor(pool, builder.doTheRunning, block, nextSteps[idx])
+
+        return block.buildStatus == BuildStatus.success
+
+    try:
+        # upstream blocks always come first, so every task exists before any of them runs.
+        for idx in range(len(blocks)):
+            tasks.append(loop.create_task(runOne(idx)))
+        await asyncio.gather(*tasks)
+    finally:
+        pool.shutdown(wait=False)
+
+    syncNextStep(builder, blocks)
+
+
+class AsyncExecutor(object):
+    """
+    executor for Builder.fastForward that runs the asyncio mode on a fresh event loop.
+    """
+    def __init__(self, maxWorkers=None):
+        self.maxWorkers = maxWorkers
+
+    def run(self, builder):
+        return asyncio.run(runBuilder(builder, maxWorkers=self.maxWorkers))
@@ -1,13 +1,44 @@
 """custom classes for attribute type recognition when saving and reloading attribute from blueprint
 """
 import sys
-from collections import OrderedDict
-import inspect
+from collections import OrderedDict, namedtuple
+
+from brick.lib import code_cache
 
 if sys.version_info[0] > 2:
     unicode = str
+    _intern = sys.intern
 else:
     unicode = unicode
+    _intern = intern
+
+# the (attrType, value) pair stored per attr, still unpacks and compares like a plain tuple.
+AttrRecord = namedtuple('AttrRecord', ['type', 'value'])
+
+
+def internName(name):
+    """
+    return the interned attr name, so the same name is stored once across all blocks.
+    """
+    try:
+        return _intern(name)
+    except TypeError:
+        return name
+
+
+def shareString(value):
+    """
+    return a shared copy of a string value, identical scripts of many blocks are kept in memory once.
+    interned strings are dropped once no block references them anymore.
+    """
+    if not isinstance(value, (str, unicode)):
+        return value
+    try:
+        return _intern(value)
+    except TypeError:
+        # python 2 only interns byte strings.
+        return value
+
 
 class BrickAttr(object):
     @classmethod
@@ -59,32 +90,134 @@ class NamedObject(BrickAttr, object):
         for key,val in locals().items():
             copyLocals[key] = val
 
-        exec (value, None, copyLocals)
+        exec (code_cache.compileSource(value), None, copyLocals)
         for key, val in copyLocals.items():
             # right now, support the assignment name to be either the variable name itself, or "self"
             if key == name or key == "self":
                 return val
 
 
+class AttrCodec(object):
+    """
+    converts the values of one attr type to and from their blueprint representation.
+    """
+    def __init__(self, attrType):
+        self.attrType = attrType
+        self.name = attrType.__name__
+
+    def encode(self, value):
+        return value
+
+    def decode(self, raw):
+        return raw
+
+
+class SharedStringCodec(AttrCodec):
+    def decode(self, raw):
+        return shareString(raw)
+
+
+class InputCodec(AttrCodec):
+    def decode(self, raw):
+        # json has no tuples, give back the same (blockName, attrName) pair an Input is created with.
+        return tuple(raw)
+
+
+_codecs = {}
+_valueTypes = {}
+
+
+def registerAttrType(attrType, codec=None, valueTypes=()):
+    """
+    register an attr type by its class name.
+
+    :param attrType: BrickAttr subclass
+    :param codec: AttrCodec instance, defaults to a pass-through codec
+    :param valueTypes: plain python types whose values are guessed as this attr type
+    """
+    codec = codec or AttrCodec(attrType)
+    _codecs[codec.name] = codec
+    for valueType in valueTypes:
+        _valueTypes[valueType] = codec.name
+    return codec
+
+
+def _findAttrType(typeName, baseClass=BrickAttr):
+    for subClass in baseClass.__subclasses__():
+        if subClass.__name__ == typeName:
+            return subClass
+        found = _findAttrType(typeName, subClass)
+        if found is not None:
+            return found
+
+
+def getCodec(typeName):
+    """
+    return the codec of an attr type given by name or class, or None when the type is unknown.
+    """
+    if isinstance(typeName, type):
+        typeName = typeName.__name__
+
+    codec = _codecs.get(typeName)
+    if codec is None:
+        # attr types defined outside this module and never registered are picked up on first use.
+        attrType = _findAttrType(typeName)
+        if attrType is not None:
+            codec = registerAttrType(attrType)
+    return codec
+
+
+for _attrType, _types in ((String, (str, unicode)),
+                           (Int, (int,)),
+                           (Float, (float,)),
+                           (Bool, (bool,)),
+                           (List, (list,)),
+                           (Dict, (dict, OrderedDict)),
+                           (Path, ()),
+                           (Chooser, ()),
+                           (TypeChosser, ())):
+    registerAttrType(_attrType, valueTypes=_types)
+registerAttrType(Script, codec=SharedStringCodec(Script))
+registerAttrType(NamedObject, codec=SharedStringCodec(NamedObject))
+registerAttrType(Input, codec=InputCodec(Input))
+del _attrType, _types
+
+
 def getTypeFromName(typeName):
-    for name, obj in inspect.getmembers(sys.modules[__name__], inspect.isclass):
-        if issubclass(obj,BrickAttr):
-            if name == typeName:
-                return obj
+    if isinstance(typeName, type) and issubclass(typeName, BrickAttr):
+        # already resolved, e.g. by serializers.resolveAttrTypes.
+        return typeName
+
+    codec = getCodec(typeName)
+    if codec is not None:
+        return codec.attrType
 
 
 def guessNameFromValue(value):
-    if isinstance(value,(str,unicode)):
-        return String.__name__
-    elif isinstance(value,int):
-        return Int.__name__
-    elif isinstance(value,float):
-        return Float.__name__
-    elif isinstance(value,bool):
-        return Bool.__name__
-    elif isinstance(value,list):
-        return List.__name__
-    elif isinstance(value,(dict,OrderedDict)):
-        return Dict.__name__
-    else:
-        raise ValueError("cannot guess value type {} ({})".format(value,type(value)))
\ No newline at end of file
+    typeName = _valueTypes.get(type(value))
+    if typeName is not None:
+        return typeName
+
+    for valueType, typeName in _valueTypes.items():
+        if isinstance(value, valueType):
+            return typeName
+
+    raise ValueError("cannot guess value type {} ({})".format(value,type(value)))
+
+
+def encodeAttr(typeVal):
+    """
+    return the blueprint representation (typeName, value) of an attr (attrType, value).
+    """
+    codec = getCodec(typeVal[0])
+    return codec.name, codec.encode(typeVal[1])
+
+
+def decodeAttr(typeVal):
+    """
+    return the attr record (attrType, value) of a blueprint representation (typeName or attrType, value).
+    """
+    codec = getCodec(typeVal[0])
+    if codec is None:
+        return AttrRecord(None, typeVal[1])
+    return AttrRecord(codec.attrType, codec.decode(typeVal[1]))
@@ -1,15 +1,33 @@
-import json
 from collections import OrderedDict
 from brick.lib.path import Path
 from .constants import BuildStatus, BLUEPRINT_EXTENSION
 from . import attr_type
 from brick import lib
+from brick.lib import result_cache, blueprint_cache, serializers
+from brick.lib.checkpoint import Checkpoint, getCheckpointPath
+from brick.lib.stream import Stream
+from brick.lib.trace import Tracer
+from brick.lib import block_log
 import traceback
+import heapq
+import inspect
+import itertools
+import threading
 import time
 import uuid
 import sys
 import logging
 
+try:
+    from collections import ChainMap
+except ImportError:
+    ChainMap = None
+
+try:
+    from types import MappingProxyType
+except ImportError:
+    MappingProxyType = dict
+
 
 log = logging.getLogger("brick")
 
@@ -18,6 +36,229 @@ if sys.version_info[0] > 2:
 else:
     unicode = unicode
 
+class BlockList(object):
+    """
+    ordered block container used for Builder.blocks.
+
+    behaves like a list of blocks, and keeps name and uuid indexes in sync through insert, remove,
+    rename and reorder so lookups do not need to scan the whole list.
+    """
+    def __init__(self, blocks=None):
+        self._blocks = []
+        self._byName = {}
+        self._byUuid = {}
+        # base name -> [frontier, holes] for nextUniqueName. suffixes below the frontier are taken, except
+        # the ones in holes, a heap of suffixes freed since the frontier passed them.
+        self._suffixes = {}
+        for block in blocks or []:
+            self.append(block)
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __iter__(self):
+        return iter(self._blocks)
+
+    def __reversed__(self):
+        return reversed(self._blocks)
+
+    def __getitem__(self, index):
+        return self._blocks[index]
+
+    def __contains__(self, block):
+        return any(each is block for each in self._byName.get(block.name, ()))
+
+    def __eq__(self, other):
+        if isinstance(other, BlockList):
+            other = other._blocks
+        return self._blocks == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __bool__(self):
+        return bool(self._blocks)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return repr(self._blocks)
+
+    def _addIndex(self, block):
+        self._byName.setdefault(block.name, []).append(block)
+        self._byUuid.setdefault(block.uuid, []).append(block)
+
+    def _removeIndex(self, index, block, key):
+        bucket = index.get(key, [])
+        for idx, each in enumerate(bucket):
+            if each is block:
+                bucket.pop(idx)
+                break
+        if not bucket:
+            index.pop(key, None)
+
+    def _first(self, bucket):
+        if len(bucket) == 1:
+            return bucket[0]
+        # duplicated key, return the one coming first in the list.
+        return min(bucket, key=self.index)
+
+    def index(self, block):
+        for idx, each in enumerate(self._blocks):
+            if each is block:
+                return idx
+        raise ValueError("{0} is not in block list".format(block))
+
+    def insert(self, index, block):
+        self._blocks.insert(index, block)
+        self._addIndex(block)
+
+    def append(self, block):
+        self.insert(len(self._blocks), block)
+
+    def extend(self, blocks):
+        for block in blocks:
+            self.append(block)
+
+    def remove(self, block):
+        self.pop(self.index(block))
+
+    def pop(self, index=-1):
+        block = self._blocks.pop(index)
+        self._removeName(block, block.name)
+        self._removeIndex(self._byUuid, block, block.uuid)
+        return block
+
+    def clear(self):
+        self._blocks = []
+        self._byName = {}
+        self._byUuid = {}
+        self._suffixes = {}
+
+    def _removeName(self, block, name):
+        self._removeIndex(self._byName, block, name)
+        if name in self._byName:
+            return
+
+        # the name is free again, let nextUniqueName hand it out. the trailing digits can be split between
+        # base name and suffix in several ways, only the tracked base names matter.
+        start = len(name)
+        while start > 0 and name[start - 1].isdigit():
+            start -= 1
+        for split in range(start, len(name) + 1):
+            state = self._suffixes.get(name[:split])
+            digits = name[split:]
+            if state is None or digits.startswith('0'):
+                continue
+            suffix = int(digits) if digits else 0
+            if suffix < state[0]:
+                heapq.heappush(state[1], suffix)
+
+    @staticmethod
+    def _suffixedName(baseName, suffix):
+        return "{0}{1}".format(baseName, suffix) if suffix else baseName
+
+    def nextUniqueName(self, baseName):
+        """
+        return the first free name out of baseName, baseName1, baseName2...
+        """
+        state = self._suffixes.setdefault(baseName, [0, []])
+        holes = state[1]
+        while holes:
+            name = self._suffixedName(baseName, holes[0])
+            if name not in self._byName:
+                return name
+            heapq.heappop(holes)
+
+        while self._suffixedName(baseName, state[0]) in self._byName:
+            state[0] += 1
+        return self._suffixedName(baseName, state[0])
+
+    def names(self):
+        return [block.name for block in self._blocks]
+
+    def hasName(self, name):
+        return name in self._byName
+
+    def getByName(self, name):
+        bucket = self._byName.get(name)
+        if bucket:
+            return self._first(bucket)
+
+    def getByUuid(self, blockUuid):
+        bucket = self._byUuid.get(str(blockUuid))
+        if bucket:
+            return self._first(bucket)
+
+    def reorder(self, names):
+        """
+        reorder the blocks following a list of block names, blocks not listed are dropped.
+        """
+        newList = []
+        for name in names:
+            block = self.getByName(name)
+            if block is not None:
+                newList.append(block)
+
+        self.clear()
+        self.extend(newList)
+
+    def blockRenamed(self, block, oldName):
+        if oldName == block.name or not any(each is block for each in self._byName.get(oldName, ())):
+            return
+        self._removeName(block, oldName)
+        self._byName.setdefault(block.name, []).append(block)
+
+    def blockUuidChanged(self, block, oldUuid):
+        if not any(each is block for each in self._byUuid.get(oldUuid, ())):
+            return
+        self._removeIndex(self._byUuid, block, oldUuid)
+        self._byUuid.setdefault(block.uuid, []).append(block)
+
+
+# versions are drawn from one counter, so two dicts never share a version, even with the same number of edits.
+_versionCounter = itertools.count(1)
+
+
+class VersionedDict(OrderedDict):
+    """
+    ordered dict with a version number bumped on every change, so derived data knows when it is stale.
+    """
+    def __init__(self, *args, **kwargs):
+        self.version = next(_versionCounter)
+        super(VersionedDict, self).__init__(*args, **kwargs)
+
+    def _changed(self):
+        self.version = next(_versionCounter)
+
+    def __setitem__(self, key, value):
+        super(VersionedDict, self).__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super(VersionedDict, self).__delitem__(key)
+        self._changed()
+
+    def pop(self, *args):
+        result = super(VersionedDict, self).pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self, *args, **kwargs):
+        result = super(VersionedDict, self).popitem(*args, **kwargs)
+        self._changed()
+        return result
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        super(VersionedDict, self).clear()
+        self._changed()
+
+
 class Builder(object):
     def __init__(self):
         self.blocks = []
@@ -30,6 +271,26 @@ class Builder(object):
         self.resultAttrMap = {}
         self.results = {}
         self.nextStep = 0
+        # opt-in lib.result_cache.ResultCache, blocks with a stored key are restored instead of executed.
+        self.resultCache = None
+        self._cacheKeys = {}
+        self.blueprintPath = None
+        # opt-in lib.checkpoint.Checkpoint, written after every successful block.
+        self.checkpoint = None
+        # opt-in lib.trace.Tracer, see enableTracing.
+        self.tracer = None
+        # global attrs evaluated once per build, see getGlobalValues.
+        self._globalValues = None
+        self._globalValuesVersion = None
+        self._globalValuesLock = threading.Lock()
+
+    @property
+    def attrs(self):
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, attrs):
+        self._attrs = attrs if isinstance(attrs, VersionedDict) else VersionedDict(attrs)
 
     @property
     def name(self):
@@ -41,6 +302,14 @@ class Builder(object):
     def name(self, name):
         self._name = name
 
+    @property
+    def blocks(self):
+        return self._blocks
+
+    @blocks.setter
+    def blocks(self, blocks):
+        self._blocks = blocks if isinstance(blocks, BlockList) else BlockList(blocks)
+
     def insertBlock(self, block, index=-1):
         if index < 0:
             index = len(self.blocks)
@@ -61,17 +330,8 @@ class Builder(object):
             baseName = prefix
         else:
             baseName = "block"
-        blockIndex = 1
-        uname = baseName
-        while True:
-            for currentBlock in self.blocks:
-                if uname == currentBlock.name:
-                    uname = "{0}{1}".format(baseName, blockIndex)
-                    blockIndex += 1
-                    break
-            else:
-                # no repeat with existing name
-                return uname
+
+        return self.blocks.nextUniqueName(baseName)
 
 
     def saveBlueprint(self, bluePrint, notes=""):
@@ -85,8 +345,7 @@ class Builder(object):
         # serialize attrs
         srAttrs = OrderedDict()
         for attrName, val in self.attrs.items():
-            attrType, attrVal = str(val[0].__name__), val[1]
-            srAttrs[attrName] = (attrType, attrVal)
+            srAttrs[attrName] = attr_type.encodeAttr(val)
 
 
         writeData['attrs'] = srAttrs
@@ -99,16 +358,17 @@ class Builder(object):
         writeData['blocks'] = blocks
 
 
-        with open(bluePrint, 'w') as fd:
-            json.dump(writeData, fd, indent=4)
+        serializers.writeBlueprint(bluePrint, writeData)
+
+        self.blueprintPath = str(bluePrint)
 
     @classmethod
-    def loadBlueprint(cls, bluePrintName):
+    def resolveBlueprintPath(cls, bluePrintName):
         filePath = Path(bluePrintName)
 
         if not filePath.exists():
             # not exists, try searching for file in blueprint directory
-            templateDir = lib.getBlueprintDir()
+            templateDir = Path(lib.getBlueprintDir())
             autoPath = templateDir / filePath
             if not autoPath.endswith(BLUEPRINT_EXTENSION):
                 autoPath = autoPath + BLUEPRINT_EXTENSION
@@ -118,20 +378,37 @@ class Builder(object):
             else:
                 filePath = autoPath
 
-        with open(filePath, 'r') as fd:
-            blueprint = json.load(fd, object_pairs_hook=OrderedDict)
+        return filePath
+
+    @classmethod
+    def loadBlueprint(cls, bluePrintName, useCache=False, lazy=False):
+        """
+        load a blueprint file into a new builder.
+
+        :param bluePrintName: blueprint path, or name in the blueprint directory
+        :param useCache: read through the process-wide blueprint cache
+        :param lazy: create block stubs, their attrs are converted on first use
+        """
+        filePath = cls.resolveBlueprintPath(bluePrintName)
+
+        if useCache:
+            blueprint = blueprint_cache.getBlueprintCache().get(filePath)
+        else:
+            blueprint = serializers.readBlueprint(filePath)
 
-        return cls.load(blueprint)
+        builder = cls.load(blueprint, lazy=lazy)
+        builder.blueprintPath = str(filePath)
+        return builder
 
     def setAttr(self, key, typeVal):
-        self.attrs[key] = typeVal
+        self.attrs[attr_type.internName(key)] = attr_type.AttrRecord(*typeVal)
 
     def connectInputs(self, key, node, attr):
         self.inputAttrs[key] = (node.name, attr)
         self.resultAttrMap[node.name] = key
 
     @classmethod
-    def load(cls, data):
+    def load(cls, data, lazy=False):
         builderCls = lib.getBuilderClassesByName(data.get('type'))
 
         builder = builderCls()
@@ -152,27 +429,80 @@ class Builder(object):
                 typeVal = (attrType, typeVal)
             #############################################################################
 
-            attrType = attr_type.getTypeFromName(typeVal[0])
-
-            convertedAttrs[attrName] = (attrType, typeVal[1])
+            convertedAttrs[attr_type.internName(attrName)] = attr_type.decodeAttr(typeVal)
 
         builder.attrs = convertedAttrs
 
         for blockData in data.get('blocks'):
-            block = Block.load(blockData)
+            block = Block.load(blockData, lazy=lazy)
             builder.insertBlock(block)
 
         return builder
 
     def reset(self):
         self.nextStep = 0
+        self._globalValues = None
         for op in self.blocks:
             op.reset()
 
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+    def enableCheckpoint(self, filePath=None):
+        """
+        write a checkpoint after every successful block, next to the blueprint unless filePath is given.
+        """
+        if filePath is None:
+            if not self.blueprintPath:
+                raise ValueError("blueprint path is unknown, checkpoint file path is required")
+            filePath = getCheckpointPath(self.blueprintPath)
+
+        self.checkpoint = Checkpoint(filePath, builderUuid=self.uuid)
+        return self.checkpoint
+
+    def resume(self, checkpointPath=None, executor=None):
+        """
+        restore the blocks finished in a checkpoint and continue from the first block that did not finish.
+        """
+        if checkpointPath is None:
+            if self.checkpoint is not None:
+                checkpointPath = self.checkpoint.filePath
+            elif self.blueprintPath:
+                checkpointPath = getCheckpointPath(self.blueprintPath)
+            else:
+                raise ValueError("blueprint path is unknown, checkpoint file path is required")
+
+        ckpt = Checkpoint.read(checkpointPath)
+        if ckpt.builderUuid and ckpt.builderUuid != str(self.uuid):
+            log.warning("checkpoint {0} was written by another blueprint".format(checkpointPath))
+
+        finished = ckpt.finishedBlocks()
+
+        # resetting clears the current checkpoint, which removes its file, and that may be the one just read.
+        self.checkpoint = None
+        self.reset()
+        ckpt.builderUuid = str(self.uuid)
+        self.checkpoint = ckpt
+
+        resumeStep = None
+        for idx, block in enumerate(self.blocks):
+            state = finished.get(block.uuid)
+            if state is None:
+                if resumeStep is None and block.active:
+                    resumeStep = idx
+                continue
+
+            block.setOutputs(state['outputs'])
+            block.getLocalRunTimeAttrs().update(state['runTimeAttrs'])
+            block.buildStatus = BuildStatus.success
+
+        self.nextStep = len(self.blocks) if resumeStep is None else resumeStep
+        log.info("resuming {0} from step {1}".format(self.name, self.nextStep))
+
+        return self.fastForward(executor=executor)
+
     def syncOrder(self, order):
-        nameMap = {block.name: block for block in self.blocks}
-        newList = [nameMap.get(name, None) for name in order if nameMap.get(name, None)]
-        self.blocks = newList
+        self.blocks.reorder(order)
 
     def syncGlobalAttrs(self, data):
         self.attrs.clear()
@@ -184,10 +514,10 @@ class Builder(object):
 
     def buildNext(self):
         try:
-            block = next(self.iterBlocks())
+            nextStep, block = next(self.iterSteps())
 
             if block:
-                self.doTheRunning(block)
+                self.doTheRunning(block, nextStep)
 
                 if block.buildStatus == BuildStatus.fail:
                     self.nextStep -= 1
@@ -197,11 +527,61 @@ class Builder(object):
         except StopIteration:
             return BuildStatus.end
 
-    def fastForward(self):
-        for block in self.iterBlocks():
-            self.doTheRunning(block)
+    def run_async(self, maxWorkers=None):
+        """
+        return a coroutine that runs the remaining blocks on the current event loop.
+        """
+        from brick import aio
+        return aio.runBuilder(self, maxWorkers=maxWorkers)
+
+    def prefetchBlueprints(self, maxWorkers=None):
+        """
+        load every nested blueprint, recursively, into the blueprint cache using parallel threads.
+        """
+        cache = blueprint_cache.getBlueprintCache()
+        pending = []
+        for block in self.blocks:
+            if block.active:
+                # peek at the attrs so lazy blocks stay unloaded.
+                pending.extend(block.getNestedBlueprints(block.peekAttrs()))
+
+        seen = set()
+        while pending:
+            filePaths = []
+            for name in pending:
+                try:
+                    filePath = str(self.resolveBlueprintPath(name))
+                except ValueError as err:
+                    log.warning("cannot prefetch blueprint: {0}".format(err))
+                    continue
+                if filePath not in seen:
+                    seen.add(filePath)
+                    filePaths.append(filePath)
+
+            pending = []
+            for data in cache.prefetch(filePaths, maxWorkers=maxWorkers).values():
+                for blockData in data.get('blocks', []):
+                    blockClass = lib.getBlockClassByName(blockData.get('type'))
+                    if blockClass is not None and blockData.get('active', True):
+                        pending.extend(blockClass.getNestedBlueprints(blockData.get('attrs', {})))
+
+    def fastForward(self, executor=None):
+        self.prefetchBlueprints()
+
+        if executor is not None:
+            return executor.run(self)
+
+        for nextStep, block in self.iterSteps():
+            self.doTheRunning(block, nextStep)
 
     def iterBlocks(self):
+        for _, block in self.iterSteps():
+            yield block
+
+    def iterSteps(self):
+        """
+        like iterBlocks, yielding (nextStep, block) pairs, nextStep being the step right after the block.
+        """
         while True:
             if self.nextStep >= len(self.blocks):
                 return
@@ -217,14 +597,101 @@ class Builder(object):
                 return
 
             self.nextStep += 1
-            yield block
-
-    def doTheRunning(self, block):
-        for key, val in self.attrs.items():
-            block.setRunTimeAttr(key, val)
-
-        block.execute()
+            yield self.nextStep, block
 
+    def doTheRunning(self, block, nextStep=None):
+        traceToken = self.tracer.begin(block, self) if self.tracer is not None else None
+        try:
+            self.applyGlobalAttrs(block)
+
+            if not self.restoreCachedResults(block):
+                block.execute()
+                self.storeCachedResults(block)
+
+            self.blockFinished(block, nextStep)
+        finally:
+            if traceToken is not None:
+                self.tracer.end(traceToken, block)
+
+    def enableTracing(self, tracer=None):
+        """
+        record every block run by this builder, and nested builders, into a lib.trace.Tracer.
+        """
+        self.tracer = tracer or Tracer()
+        return self.tracer
+
+    def writeTrace(self, filePath):
+        if self.tracer is None:
+            raise ValueError("tracing is not enabled on {0}".format(self.name))
+        self.tracer.write(filePath)
+
+    def blockFinished(self, block, nextStep=None):
+        self.collectResults(block)
+
+        if self.checkpoint is not None and block.buildStatus == BuildStatus.success:
+            if nextStep is None:
+                nextStep = self.blocks.index(block) + 1
+            self.checkpoint.addBlock(block, nextStep)
+
+    def getCacheKey(self, block):
+        globalValues = dict(self.getGlobalValues())
+
+        upstreamKeys = []
+        for name in block.getInputBlockNames():
+            upstream = self.blocks.getByName(name)
+            upstreamKey = self._cacheKeys.get(upstream.uuid) if upstream is not None else None
+            if upstreamKey is None:
+                # upstream outputs are unknown, the block cannot be memoized.
+                return None
+            upstreamKeys.append(upstreamKey)
+
+        return result_cache.blockKey(block, globalValues, upstreamKeys)
+
+    def restoreCachedResults(self, block):
+        if self.resultCache is None:
+            return False
+
+        key = self.getCacheKey(block)
+        self._cacheKeys[block.uuid] = key
+        if key is None:
+            return False
+
+        outputs = self.resultCache.get(key)
+        if outputs is None:
+            return False
+
+        block.setOutputs(outputs)
+        block.buildStatus = BuildStatus.success
+        log.info("{0}: unchanged, outputs restored from cache".format(block.name))
+        return True
+
+    def storeCachedResults(self, block):
+        if self.resultCache is None or block.buildStatus != BuildStatus.success:
+            return
+
+        key = self._cacheKeys.get(block.uuid)
+        if key is not None:
+            self.resultCache.set(key, block.getOutputs())
+
+    def getGlobalValues(self):
+        """
+        return the evaluated global attrs as a read-only mapping.
+        evaluation happens once per build, and again only when the header attrs change.
+        """
+        with self._globalValuesLock:
+            if self._globalValues is None or self._globalValuesVersion != self.attrs.version:
+                values = OrderedDict()
+                for key, (attrType, attrVal) in self.attrs.items():
+                    # later attrs see the ones evaluated before them, as they did in each block.
+                    values[key] = attrType.evaluate(key, attrVal, parent_locals=values)
+                self._globalValues = MappingProxyType(values)
+                self._globalValuesVersion = self.attrs.version
+            return self._globalValues
+
+    def applyGlobalAttrs(self, block):
+        block.setGlobalRunTimeAttrs(self.getGlobalValues())
+
+    def collectResults(self, block):
         if block in self.resultAttrMap:
             key = self.resultAttrMap[block]
             node, attr = self.resultAttrs[key]
@@ -239,14 +706,20 @@ class GenericBuilder(Builder):
 
 
 class Block(object):
+    # attributes every block carries live in slots, the instance __dict__ only holds outputs.
+    __slots__ = ('_uuid', 'notes', '_attrs', '_pendingAttrs', 'runTimeAttrs', '_results', '_name', 'log', 'active',
+                 'parent', 'buildStatus', '__dict__', '__weakref__')
+    _coreAttrNames = frozenset(__slots__)
+
     def __init__(self):
+        self._pendingAttrs = None
         self.uuid = str(uuid.uuid4())
         self.notes = ''
         self.attrs = {}
         self.runTimeAttrs = {}
         self._results = None
         self._name = None
-        self.log = ''
+        self.log = block_log.BlockLog()
         self.active = True
         self.parent = None
         self.buildStatus = BuildStatus.nothing
@@ -254,8 +727,84 @@ class Block(object):
     def new_uuid(self):
         self.uuid = str(uuid.uuid4())
 
+    @property
+    def uuid(self):
+        return self._uuid
+
+    @uuid.setter
+    def uuid(self, blockUuid):
+        oldUuid = getattr(self, '_uuid', None)
+        if oldUuid is None:
+            self._uuid = str(blockUuid)
+            return
+
+        # the default name is derived from the uuid, keep the name index in sync as well.
+        oldName = self.name
+        self._uuid = str(blockUuid)
+        container = self._container()
+        if container is not None:
+            container.blockUuidChanged(self, oldUuid)
+            container.blockRenamed(self, oldName)
+
+    def _container(self):
+        parent = getattr(self, 'parent', None)
+        return getattr(parent, 'blocks', None)
+
+    @property
+    def attrs(self):
+        if self._pendingAttrs is not None:
+            self.materialize()
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, attrs):
+        self._pendingAttrs = None
+        self._attrs = attrs
+
+    def isMaterialized(self):
+        """
+        return False while the block is a lazy stub whose attrs are not converted yet.
+        """
+        return self._pendingAttrs is None
+
+    def materialize(self):
+        """
+        convert the raw attrs data of a lazy stub into attrs.
+        """
+        rawAttrs, self._pendingAttrs = self._pendingAttrs, None
+        if rawAttrs is not None:
+            self._attrs = self.convertAttrs(rawAttrs)
+
+    def peekAttrs(self):
+        """
+        return attrs, or the raw attrs data of a lazy stub without converting it.
+        """
+        if self._pendingAttrs is not None:
+            return self._pendingAttrs
+        return self._attrs
+
     def setAttr(self, key, typeVal):
-        self.attrs[key] = typeVal
+        self.attrs[attr_type.internName(key)] = attr_type.AttrRecord(*typeVal)
+
+    def getLocalRunTimeAttrs(self):
+        """
+        return the runtime attrs of the block itself, without the global attrs layered below them.
+        """
+        if ChainMap is not None and isinstance(self.runTimeAttrs, ChainMap):
+            return self.runTimeAttrs.maps[0]
+        return self.runTimeAttrs
+
+    def setGlobalRunTimeAttrs(self, globalValues):
+        """
+        layer the block runtime attrs over the shared global values, without copying them.
+        """
+        localAttrs = self.getLocalRunTimeAttrs()
+        if ChainMap is None:
+            merged = dict(globalValues)
+            merged.update(localAttrs)
+            self.runTimeAttrs = merged
+        else:
+            self.runTimeAttrs = ChainMap(localAttrs, globalValues)
 
     def setRunTimeAttr(self, attrName, typeVal):
         attrType, attrVal = typeVal
@@ -265,20 +814,42 @@ class Block(object):
         self.runTimeAttrs[attrName] = attrVal
 
 
-    def execute(self):
-        try:
+    @classmethod
+    def isAsync(cls):
+        iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+        return bool(iscoroutinefunction and iscoroutinefunction(cls._execute))
+
+    def execute(self, resolveInputs=True):
+        with block_log.capture(self.log):
+            try:
+                stime = self.startExecute(resolveInputs=resolveInputs)
+                if self.isAsync():
+                    from brick import aio
+                    aio.runSync(self._execute())
+                else:
+                    self._execute()
+                self.finishExecute(stime)
+            except Exception:
+                self.failExecute()
+
+    def startExecute(self, resolveInputs=True):
+        # the run replaces the outputs, stop the streams of the previous one.
+        self.closeStreams()
+        if resolveInputs:
             self.ingestInputs()
-            self.ingestAttrs()
-            log.debug("{0}: start running...".format(self.name))
-            stime = time.time()
-            self._execute()
-            etime = time.time()
-            log.info("{0}: finished in {1} s".format(self.name, round(etime - stime,2)))
-            self.buildStatus = BuildStatus.success
-        except Exception:
-            traceStr = '\n'.join(traceback.format_exception(*sys.exc_info()))
-            print(traceStr)
-            self.buildStatus = BuildStatus.fail
+        self.ingestAttrs()
+        log.debug("{0}: start running...".format(self.name))
+        return time.time()
+
+    def finishExecute(self, stime):
+        etime = time.time()
+        log.info("{0}: finished in {1} s".format(self.name, round(etime - stime,2)))
+        self.buildStatus = BuildStatus.success
+
+    def failExecute(self):
+        traceStr = '\n'.join(traceback.format_exception(*sys.exc_info()))
+        print(traceStr)
+        self.buildStatus = BuildStatus.fail
 
     @property
     def name(self):
@@ -286,7 +857,11 @@ class Block(object):
 
     @name.setter
     def name(self, name):
+        oldName = self.name
         self._name = name
+        container = self._container()
+        if container is not None:
+            container.blockRenamed(self, oldName)
 
     @property
     def results(self):
@@ -303,9 +878,8 @@ class Block(object):
             if attrType == attr_type.Input:
                 nodeName, attr = attrVal
 
-                try:
-                    node = next(bl for bl in self.parent.blocks if bl.name == nodeName)
-                except StopIteration:
+                node = self.parent.blocks.getByName(nodeName)
+                if node is None:
                     raise ValueError("cannot find input block name: {}".format(nodeName))
 
                 try:
@@ -313,6 +887,25 @@ class Block(object):
                 except AttributeError:
                     raise ValueError("cannot find attribute {} from input block {}".format(attr, node.name))
 
+    @classmethod
+    def getNestedBlueprints(cls, attrs):
+        """
+        return the names of the blueprints a block runs, from its attrs or raw attrs data.
+        """
+        return []
+
+    def getInputBlockNames(self):
+        names = []
+        for attrName, typeVal in self.attrs.items():
+            attrType, attrVal = typeVal
+
+            if attrType == attr_type.Input:
+                nodeName, attr = attrVal
+                if nodeName not in names:
+                    names.append(nodeName)
+
+        return names
+
     def ingestAttrs(self):
         for key, typeVal in self.attrs.items():
             attrType, attrVal = typeVal
@@ -323,6 +916,30 @@ class Block(object):
 
             self.runTimeAttrs[key] = typeVal[1]
 
+    def stream(self, iterable, bufferSize=64):
+        """
+        return a started lib.stream.Stream over iterable, to be set as an output downstream blocks consume lazily.
+        """
+        return Stream(iterable, bufferSize=bufferSize, name=self.name).start()
+
+    def getOutputs(self):
+        return dict((key, val) for key, val in vars(self).items() if key not in self._coreAttrNames)
+
+    def setOutputs(self, outputs):
+        for key, val in outputs.items():
+            current = vars(self).get(key)
+            if isinstance(current, Stream) and current is not val:
+                current.close()
+            setattr(self, key, val)
+
+    def closeStreams(self):
+        """
+        stop the producer of every Stream output, a stream nobody consumes keeps its thread and buffer alive.
+        """
+        for val in list(vars(self).values()):
+            if isinstance(val, Stream):
+                val.close()
+
     def setNotes(self, notes):
         self.notes = notes
 
@@ -337,15 +954,34 @@ class Block(object):
         # serialize attrs
         srAttrs = OrderedDict()
         for attrName, val in self.attrs.items():
-            attrType, attrVal = str(val[0].__name__), val[1]
-            srAttrs[attrName] =(attrType, attrVal)
+            srAttrs[attrName] = attr_type.encodeAttr(val)
 
         data['attrs'] = srAttrs
 
         return data
 
+    @staticmethod
+    def convertAttrs(rawAttrs):
+        convertedAttrs = OrderedDict()
+
+        for attrName, typeVal in rawAttrs.items():
+            # for old format compatibility with no attrType stored
+            # can be removed in the future when all the blueprints have been updated to have attrType
+            if not isinstance(typeVal, (list, tuple)):
+                attrType = attr_type.guessNameFromValue(typeVal)
+                typeVal = (attrType, typeVal)
+            ########################################################################################
+
+            convertedAttrs[attr_type.internName(attrName)] = attr_type.decodeAttr(typeVal)
+
+        return convertedAttrs
+
     @classmethod
-    def load(cls, data):
+    def load(cls, data, lazy=False):
+        """
+        create a block from dumped data. with lazy, the attrs are kept raw until the block is executed,
+        edited or dumped.
+        """
         blockClass = lib.getBlockClassByName(data.get('type'))
 
         block = blockClass()
@@ -358,20 +994,10 @@ class Block(object):
         if uuid:
             block.uuid = uuid
 
-        convertedAttrs = OrderedDict()
-
-        for attrName, typeVal in data.get('attrs').items():
-            # for old format compatibility with no attrType stored
-            # can be removed in the future when all the blueprints have been updated to have attrType
-            if not isinstance(typeVal, (list, tuple)):
-                attrType = attr_type.guessNameFromValue(typeVal)
-                typeVal = (attrType, typeVal)
-            ########################################################################################
-
-            attrType = attr_type.getTypeFromName(typeVal[0])
-            convertedAttrs[attrName] = (attrType, typeVal[1])
-
-        block.attrs = convertedAttrs
+        if lazy:
+            block._pendingAttrs = data.get('attrs')
+        else:
+            block.attrs = cls.convertAttrs(data.get('attrs'))
         block.active = data.get('active')
         return block
 
@@ -395,7 +1021,8 @@ class Block(object):
     def reset(self):
         self.buildStatus = BuildStatus.nothing
         self.runTimeAttrs = {}
-        self.log = ''
+        self.log.clear()
+        self.closeStreams()
 
 
 
@@ -15,12 +15,21 @@ class BuilderBlock(Generic):
     )
 
 
+    @classmethod
+    def getNestedBlueprints(cls, attrs):
+        typeVal = attrs.get('blueprint')
+        if isinstance(typeVal, (list, tuple)):
+            typeVal = typeVal[1]
+        return [typeVal] if typeVal else []
+
     def _execute(self):
         locals().update(self.runTimeAttrs)
 
         attrType, blueprintName = self.attrs.get('blueprint')
 
-        builder = GenericBuilder.loadBlueprint(blueprintName)
+        builder = GenericBuilder.loadBlueprint(blueprintName, useCache=True)
+        # nested blocks show up under this block in the parent trace.
+        builder.tracer = getattr(self.parent, 'tracer', None)
 
         builder.fastForward()
 
@@ -1,34 +1,38 @@
+import types
+
 from brick import attr_type
+from brick.lib import code_cache
 from brick.base import Generic, Custom
 
 
+def runScript(block, source):
+    """
+    exec source in a namespace seeded with the runtime attrs of block, and set the names the script
+    defines as outputs of block. imported modules are not outputs.
+    """
+    namespace = dict(block.runTimeAttrs)
+    namespace['self'] = block
+    seeded = set(namespace)
+
+    exec(code_cache.compileSource(source), namespace)
+
+    for key, val in namespace.items():
+        if key in seeded or key == '__builtins__' or isinstance(val, types.ModuleType):
+            continue
+        setattr(block, key, val)
+
+
 class ScriptBlock(Generic):
     ui_order = 11
     ui_icon_name = "python_script.svg"
     fixedAttrs = (('script', (attr_type.Script, '')),)
 
     def _execute(self):
-        locals().update(self.runTimeAttrs)
-
-        oldLocals = {}
-        for key, val in locals().items():
-            oldLocals[key] = val
-
-        func = self.runTimeAttrs.get('script')
-
-        if not func:
+        source = self.runTimeAttrs.get('script')
+        if not source:
             return
 
-        exec(func)
-
-        addedLocals = {}
-
-        for key, val in locals().items():
-            if key not in oldLocals:
-                addedLocals[key] = val
-
-        for key, val in addedLocals.items():
-            setattr(self, key, val)
+        runScript(self, source)
 
 
 # from brick.lib import classproperty
@@ -38,29 +42,7 @@ class TestScriptBlock(Custom):
     fixedAttrs = (('script', (attr_type.Script, '')),)
 
     def _execute(self):
-        locals().update(self.runTimeAttrs)
-
-        oldLocals = {}
-        for key, val in locals().items():
-            oldLocals[key] = val
-
-        func = self.runTimeAttrs.get('script')
-
-        func = 'print("RUN {}")'.format(self.name)
-
-        if not func:
-            return
-
-        exec(func)
-
-        addedLocals = {}
-
-        for key, val in locals().items():
-            if key not in oldLocals:
-                addedLocals[key] = val
-
-        for key, val in addedLocals.items():
-            setattr(self, key, val)
+        runScript(self, 'print("RUN {}")'.format(self.name))
 
     # @classproperty
     # def fixedAttrs(cls):
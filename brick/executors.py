@@ -0,0 +1,296 @@
+"""execution strategies for Builder.fastForward.
+
+the default (no executor) runs blocks one after another. the executors in this module build a
+dependency graph out of the blocks' Input attrs and run independent blocks concurrently.
+"""
+import multiprocessing
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent import futures
+
+from brick.constants import BuildStatus
+from brick.base import log, Block
+from brick import lib
+from brick.lib.result_cache import picklable
+
+
+class DependencyGraph(object):
+    """
+    dependency graph of a list of blocks, stored by block index.
+
+    a block with Input attrs depends on the blocks it reads from. a block without declared inputs
+    falls back to list order and waits for every block before it.
+    """
+    def __init__(self, blocks):
+        self.blocks = list(blocks)
+        # upstream indices that have to finish before a block can start.
+        self.upstream = []
+        # subset of upstream that the block reads Input attrs from.
+        self.inputUpstream = []
+        self._build()
+
+    def _build(self):
+        # blocks that no later block waits for yet. waiting for all of them is waiting for every earlier block.
+        self._sinks = set()
+        indexMap = {}
+        for idx, block in enumerate(self.blocks):
+            inputNames = block.getInputBlockNames()
+            if inputNames:
+                # inputs pointing outside the scheduled blocks were built in an earlier step.
+                inputDeps = set(indexMap[name] for name in inputNames if name in indexMap)
+            else:
+                inputDeps = None
+
+            self.upstream.append(self._blockDeps(idx, block, inputDeps))
+            self.inputUpstream.append(set(inputDeps or ()))
+            indexMap.setdefault(block.name, idx)
+
+    def _blockDeps(self, idx, block, inputDeps):
+        """
+        return the upstream indices of a block. inputDeps is None when the block declares no inputs.
+        """
+        deps = set(self._sinks) if inputDeps is None else set(inputDeps)
+        self._sinks -= deps
+        self._sinks.add(idx)
+        return deps
+
+    def downstream(self):
+        downMap = [[] for _ in self.blocks]
+        for idx, deps in enumerate(self.upstream):
+            for dep in deps:
+                downMap[dep].append(idx)
+        return downMap
+
+    def roots(self):
+        return [idx for idx, deps in enumerate(self.upstream) if not deps]
+
+
+def syncNextStep(builder, blocks):
+    """
+    let buildNext pick up from the first scheduled block that did not succeed.
+    """
+    for block in blocks:
+        if block.buildStatus != BuildStatus.success:
+            builder.nextStep = builder.blocks.index(block)
+            return
+
+
+class SerialExecutor(object):
+    """
+    runs blocks one by one in list order, same as Builder.fastForward without an executor.
+    """
+    def run(self, builder):
+        for nextStep, block in builder.iterSteps():
+            builder.doTheRunning(block, nextStep)
+
+
+class DagExecutor(object):
+    """
+    base class for executors that schedule blocks on a pool following the dependency graph.
+
+    blocks downstream of a failed block through an Input attr are skipped; the rest of the graph
+    keeps running, like the serial run does.
+    """
+    def __init__(self, maxWorkers=None):
+        self.maxWorkers = maxWorkers
+
+    def _createPool(self):
+        raise NotImplementedError
+
+    def _releasePool(self, pool):
+        pool.shutdown(wait=True)
+
+    def _submit(self, pool, builder, block, nextStep):
+        raise NotImplementedError
+
+    def _finish(self, builder, block, nextStep, future):
+        future.result()
+
+    def run(self, builder):
+        steps = list(builder.iterSteps())
+        if not steps:
+            return
+        nextSteps = [nextStep for nextStep, _ in steps]
+        blocks = [block for _, block in steps]
+
+        graph = DependencyGraph(blocks)
+        downMap = graph.downstream()
+        waiting = [set(deps) for deps in graph.upstream]
+        doomed = set()
+
+        pool = self._createPool()
+        try:
+            running = OrderedDict()
+            for idx in graph.roots():
+                running[self._submit(pool, builder, blocks[idx], nextSteps[idx])] = idx
+
+            while running:
+                done, _ = futures.wait(list(running), return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    idx = running.pop(future)
+                    block = blocks[idx]
+                    try:
+                        self._finish(builder, block, nextSteps[idx], future)
+                    except Exception:
+                        log.exception("{0}: executor error".format(block.name))
+                        block.buildStatus = BuildStatus.fail
+
+                    failed = block.buildStatus == BuildStatus.fail
+                    for downIdx in self._release(graph, downMap, waiting, doomed, idx, failed):
+                        running[self._submit(pool, builder, blocks[downIdx], nextSteps[downIdx])] = downIdx
+        finally:
+            self._releasePool(pool)
+
+        syncNextStep(builder, blocks)
+
+    def _release(self, graph, downMap, waiting, doomed, idx, failed):
+        """
+        mark a block as done and return the blocks that can start now.
+
+        blocks reading an Input from a failed block are skipped, but only once all their upstream is done,
+        so the blocks ordered after them still wait for everything before.
+        """
+        ready = []
+        stack = [(idx, failed)]
+        while stack:
+            idx, failed = stack.pop()
+            for downIdx in downMap[idx]:
+                if failed and idx in graph.inputUpstream[downIdx]:
+                    doomed.add(downIdx)
+
+                waiting[downIdx].discard(idx)
+                if waiting[downIdx]:
+                    continue
+
+                if downIdx in doomed:
+                    log.warning("{0}: skipped, an input block failed.".format(graph.blocks[downIdx].name))
+                    stack.append((downIdx, True))
+                else:
+                    ready.append(downIdx)
+        return ready
+
+
+class ThreadExecutor(DagExecutor):
+    """
+    runs independent blocks concurrently on a thread pool.
+    """
+    def _createPool(self):
+        return futures.ThreadPoolExecutor(max_workers=self.maxWorkers)
+
+    def _submit(self, pool, builder, block, nextStep):
+        return pool.submit(builder.doTheRunning, block, nextStep)
+
+
+_processPools = {}
+_processPoolsLock = threading.Lock()
+
+
+def getProcessContext():
+    try:
+        context = multiprocessing.get_context("forkserver")
+    except ValueError:
+        # forkserver is not available on windows.
+        return multiprocessing.get_context("spawn")
+
+    context.set_forkserver_preload(["brick.base", "brick.lib", "brick.blocks"])
+    return context
+
+
+def _initWorker():
+    # warm the worker up front so the first block does not pay for the imports.
+    from brick import blocks
+    lib.getBlockClasses()
+
+
+def getProcessPool(maxWorkers=None):
+    """
+    return a warm process pool, created once and reused across builds.
+    """
+    with _processPoolsLock:
+        pool = _processPools.get(maxWorkers)
+        if pool is None:
+            pool = futures.ProcessPoolExecutor(max_workers=maxWorkers,
+                                               mp_context=getProcessContext(),
+                                               initializer=_initWorker)
+            _processPools[maxWorkers] = pool
+        return pool
+
+
+def discardProcessPool(maxWorkers=None):
+    with _processPoolsLock:
+        pool = _processPools.pop(maxWorkers, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def shutdownProcessPools():
+    with _processPoolsLock:
+        pools = list(_processPools.values())
+        _processPools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+def _runBlockInWorker(blockData, runTimeAttrs):
+    block = Block.load(blockData)
+    block.runTimeAttrs = runTimeAttrs
+    stime = time.time()
+    block.execute(resolveInputs=False)
+    timing = (stime, time.time(), os.getpid(), threading.current_thread().ident)
+    logText = block.log.text() if block.log else None
+    return block.buildStatus, picklable(block.getOutputs()), timing, logText
+
+
+class ProcessExecutor(DagExecutor):
+    """
+    runs independent blocks concurrently in a pool of worker processes.
+
+    each block is shipped as its dump() plus the runtime attrs resolved in this process (global attrs
+    and Input attrs), so everything a block reads has to be picklable. outputs that can be pickled are
+    sent back and set on the block. the pool stays alive across builds.
+    """
+    def _createPool(self):
+        return getProcessPool(self.maxWorkers)
+
+    def _releasePool(self, pool):
+        # keep the workers warm for the next build.
+        pass
+
+    def _submit(self, pool, builder, block, nextStep):
+        builder.applyGlobalAttrs(block)
+        try:
+            if builder.restoreCachedResults(block):
+                future = futures.Future()
+                future.set_result((block.buildStatus, {}, None, None))
+                return future
+
+            block.ingestInputs()
+            # flatten the block attrs and the global values below them into one picklable dict.
+            return pool.submit(_runBlockInWorker, block.dump(), dict(block.runTimeAttrs))
+        except Exception as err:
+            future = futures.Future()
+            future.set_exception(err)
+            return future
+
+    def _finish(self, builder, block, nextStep, future):
+        try:
+            status, outputs, timing, logText = future.result()
+        except futures.process.BrokenProcessPool:
+            discardProcessPool(self.maxWorkers)
+            raise
+
+        block.setOutputs(outputs)
+        block.buildStatus = status
+        if logText:
+            # already echoed by the worker, only keep it on the block.
+            block.log.write(logText)
+        builder.storeCachedResults(block)
+        builder.blockFinished(block, nextStep)
+
+        if builder.tracer is not None and timing is not None:
+            start, end, pid, tid = timing
+            builder.tracer.record(block.name, block.__class__.__name__, start, end, status=status,
+                                  depth=builder.tracer.currentDepth(), builderName=builder.name,
+                                  pid=pid, tid=tid, threadName='worker {0}'.format(pid))
@@ -1,4 +1,5 @@
 import maya.cmds as mc
+import maya.utils
 from qqt import QtGui, QtCore, QtWidgets
 from qqt.gui import VBoxLayout
 from qqt.lib import wrapInstance
@@ -24,3 +25,13 @@ class Maya_Log_Widget(QtWidgets.QWidget):
         self.output_log_widget = convertMayaControl(outputLog)
         layout.addWidget(self.output_log_widget)
 
+
+class MayaScheduler(object):
+    """
+    maya host hook. scene commands have to run on the main thread, so builds step there, and each step is
+    deferred to the maya idle queue so the ui, viewport and script editor keep updating.
+    """
+    requiresMainThread = True
+
+    def schedule(self, callback):
+        maya.utils.executeDeferred(callback)
@@ -1,10 +1,19 @@
 from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
 import pkgutil
 import inspect
 import json
+import os
+import threading
+import time
 import logging
 log = logging.getLogger("brick")
 
+try:
+    _replace = os.replace
+except AttributeError:
+    _replace = os.rename
+
 class classproperty(object):
     def __init__(self, getter):
         self.getter = getter
@@ -25,6 +34,24 @@ def getBuildDir():
     return tempfile.gettempdir()
 
 
+@contextmanager
+def atomicWrite(filePath, mode='wb'):
+    """
+    open a temporary file next to filePath for writing, and move it over filePath once the with block
+    succeeds, so readers never see a partly written file. the temporary file is removed on errors.
+    """
+    filePath = str(filePath)
+    tmpPath = '{0}.{1}.{2}.tmp'.format(filePath, os.getpid(), threading.current_thread().ident)
+    try:
+        with open(tmpPath, mode) as fd:
+            yield fd
+        _replace(tmpPath, filePath)
+    except BaseException:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
+
+
 def loadData(blueprintPath):
     """
     return loaded content of file.
@@ -44,9 +71,7 @@ def getClasses(baseClass):
 
 
 def getBlockClassByName(className):
-    for block in getBlockClasses():
-        if block.__name__ == className:
-            return block
+    return _blockRegistry.get(className)
 
 
 def getBuilderClassesByName(className):
@@ -55,18 +80,97 @@ def getBuilderClassesByName(className):
             return builder
 
 
+class BlockRegistry(object):
+    """
+    block classes found in the brick.blocks package, scanned once and cached.
+
+    the cache is rebuilt on refresh(), or when a block module is added, removed or its mtime changes.
+    modules are checked at most once every checkInterval seconds.
+    """
+    checkInterval = 1.0
+
+    def __init__(self):
+        self._classes = []
+        self._classMap = {}
+        self._mtimes = None
+        self._lastCheck = 0
+        self._lock = threading.RLock()
+
+    def _iterModules(self):
+        from brick import blocks
+        return pkgutil.iter_modules(blocks.__path__)
+
+    def _moduleMtimes(self):
+        mtimes = {}
+        for importer, modname, ispkg in self._iterModules():
+            modulePath = os.path.join(importer.path, modname)
+            if not ispkg:
+                modulePath += '.py'
+            try:
+                mtimes[modname] = os.path.getmtime(modulePath)
+            except OSError:
+                mtimes[modname] = None
+        return mtimes
+
+    def _scan(self):
+        from brick.base import Block
+
+        classes = []
+        for importer, modname, ispkg in self._iterModules():
+            module = importer.find_module(modname).load_module(modname)
+            for name, member in inspect.getmembers(module, inspect.isclass):
+                if issubclass(member, Block) and member.isValidClass():
+                    classes.append(member)
+
+        classMap = {}
+        for cls in classes:
+            classMap.setdefault(cls.__name__, cls)
+
+        self._classes = classes
+        self._classMap = classMap
+        self._mtimes = self._moduleMtimes()
+        self._lastCheck = time.time()
+
+    def _ensure(self):
+        with self._lock:
+            if self._mtimes is None:
+                self._scan()
+                return
+
+            now = time.time()
+            if now - self._lastCheck < self.checkInterval:
+                return
+
+            self._lastCheck = now
+            if self._moduleMtimes() != self._mtimes:
+                log.debug("block modules changed, rescanning block classes.")
+                self._scan()
+
+    def refresh(self):
+        with self._lock:
+            self._scan()
+
+    def classes(self):
+        self._ensure()
+        return list(self._classes)
+
+    def get(self, className):
+        self._ensure()
+        return self._classMap.get(className)
+
+
+_blockRegistry = BlockRegistry()
+
+
 def getBlockClasses():
-    from brick.base import Block
-    from brick import blocks
+    return _blockRegistry.classes()
 
-    classes = []
-    for importer, modname, ispkg in pkgutil.iter_modules(blocks.__path__):
-        module = importer.find_module(modname).load_module(modname)
-        for name, member in inspect.getmembers(module, inspect.isclass):
-            if issubclass(member, Block) and member.isValidClass():
-                classes.append(member)
 
-    return classes
+def refreshBlockClasses():
+    """
+    force a rescan of the block modules.
+    """
+    _blockRegistry.refresh()
 
 
 def getBuilderClasses():
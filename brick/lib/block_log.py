@@ -0,0 +1,242 @@
+"""per-block capture of logging records, stdout and stderr.
+
+while a block executes, everything it logs or prints is appended to its own BlockLog, a bounded ring
+buffer exposed as block.log. routing follows the current thread or asyncio task through a context
+variable, so concurrently running blocks each get their own output. sys.stdout and sys.stderr are
+wrapped once by a dispatching proxy instead of being swapped for every block, and logging records are
+kept as they are and only formatted when the log text is read.
+"""
+import logging
+import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+DEFAULT_CAPACITY = 2000
+
+# also write captured output to the original streams, so consoles and log widgets keep showing it.
+echo = True
+
+_formatter = logging.Formatter('%(levelname)s %(name)s: %(message)s')
+
+# one lock for all buffers, writes are short and a lock per block would cost memory on big blueprints.
+_bufferLock = threading.Lock()
+
+
+class BlockLog(object):
+    """
+    ring buffer of the output of one block, keeping the last capacity entries.
+    """
+    __slots__ = ('capacity', 'dropped', '_entries')
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.dropped = 0
+        # created on first write, quiet blocks carry no buffer.
+        self._entries = None
+
+    def _append(self, entry):
+        with _bufferLock:
+            if self._entries is None:
+                self._entries = deque(maxlen=self.capacity)
+            elif len(self._entries) == self.capacity:
+                self.dropped += 1
+            self._entries.append(entry)
+
+    def write(self, text):
+        if text:
+            self._append(text)
+
+    def addRecord(self, record):
+        self._append(record)
+
+    def clear(self):
+        with _bufferLock:
+            self._entries = None
+            self.dropped = 0
+
+    def records(self):
+        """
+        return the captured logging records.
+        """
+        with _bufferLock:
+            return [each for each in self._entries or () if isinstance(each, logging.LogRecord)]
+
+    def text(self):
+        with _bufferLock:
+            entries = list(self._entries or ())
+            dropped = self.dropped
+
+        chunks = ['... {0} earlier entries dropped\n'.format(dropped)] if dropped else []
+        for entry in entries:
+            if isinstance(entry, logging.LogRecord):
+                chunks.append(_formatter.format(entry) + '\n')
+            else:
+                chunks.append(entry)
+        return ''.join(chunks)
+
+    def __str__(self):
+        return self.text()
+
+    def __len__(self):
+        return len(self._entries or ())
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        if isinstance(other, BlockLog):
+            return self is other
+        return self.text() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return '<BlockLog {0} entries>'.format(len(self))
+
+    def __getstate__(self):
+        return {'capacity': self.capacity, 'text': self.text()}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'])
+        self.write(state['text'])
+
+
+if contextvars is not None:
+    _current = contextvars.ContextVar('brick_block_log', default=None)
+
+    def getCurrentLog():
+        return _current.get()
+
+    def _setCurrentLog(blockLog):
+        return _current.set(blockLog)
+
+    def _restoreCurrentLog(token):
+        _current.reset(token)
+else:
+    _local = threading.local()
+
+    def getCurrentLog():
+        return getattr(_local, 'blockLog', None)
+
+    def _setCurrentLog(blockLog):
+        token = getCurrentLog()
+        _local.blockLog = blockLog
+        return token
+
+    def _restoreCurrentLog(token):
+        _local.blockLog = token
+
+
+class DispatchStream(object):
+    """
+    stands in for sys.stdout or sys.stderr, sending writes to the log of the block running in the current
+    thread or task, and to the original stream.
+    """
+    def __init__(self, target):
+        self.target = target
+
+    def write(self, text):
+        blockLog = getCurrentLog()
+        if blockLog is not None:
+            blockLog.write(text)
+            if not echo:
+                return
+        if self.target is not None:
+            return self.target.write(text)
+
+    def flush(self):
+        if self.target is not None:
+            self.target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+class DispatchHandler(logging.Handler):
+    """
+    root logging handler that appends records to the log of the block running in the current thread or task.
+    """
+    def emit(self, record):
+        blockLog = getCurrentLog()
+        if blockLog is not None:
+            blockLog.addRecord(record)
+
+        # being on the root logger hides logging.lastResort, stand in for it when nothing else handles the record.
+        lastResort = getattr(logging, 'lastResort', None)
+        if lastResort is not None and record.levelno >= lastResort.level and not self._hasOtherHandlers(record):
+            # write past the stderr proxy, the record is already in the block log.
+            stream = sys.stderr.target if isinstance(sys.stderr, DispatchStream) else sys.stderr
+            if stream is not None:
+                stream.write(lastResort.format(record) + '\n')
+
+    def _hasOtherHandlers(self, record):
+        logger = logging.getLogger(record.name)
+        while logger is not None:
+            if any(handler is not self for handler in logger.handlers):
+                return True
+            if not logger.propagate:
+                break
+            logger = logger.parent
+        return False
+
+
+_handler = DispatchHandler()
+_installLock = threading.Lock()
+_captureCount = 0
+
+
+def install():
+    """
+    put the dispatching stream proxies in place. only does work when a stream was replaced since the last call.
+    """
+    with _installLock:
+        for name in ('stdout', 'stderr'):
+            stream = getattr(sys, name)
+            if not isinstance(stream, DispatchStream):
+                setattr(sys, name, DispatchStream(stream))
+
+
+def _attachHandler():
+    global _captureCount
+    with _installLock:
+        _captureCount += 1
+        if _captureCount == 1:
+            logging.getLogger().addHandler(_handler)
+
+
+def _detachHandler():
+    # the handler only sits on the root logger while blocks run, a root handler left behind would turn
+    # logging.basicConfig of the host process into a no-op.
+    global _captureCount
+    with _installLock:
+        _captureCount -= 1
+        if _captureCount == 0:
+            logging.getLogger().removeHandler(_handler)
+
+
+@contextmanager
+def capture(blockLog):
+    """
+    route logging records, stdout and stderr of the current thread or task to blockLog.
+    """
+    if not isinstance(sys.stdout, DispatchStream) or not isinstance(sys.stderr, DispatchStream):
+        install()
+
+    _attachHandler()
+    token = _setCurrentLog(blockLog)
+    try:
+        yield blockLog
+    finally:
+        _restoreCurrentLog(token)
+        _detachHandler()
@@ -0,0 +1,81 @@
+"""process-wide cache of parsed blueprint files.
+
+entries are keyed by the resolved blueprint path and checked against the file mtime and size. every
+lookup hands out a fresh copy of the parsed data, so builders loaded from the cache never share state.
+"""
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent import futures
+
+import logging
+log = logging.getLogger("brick")
+
+
+def _cacheKey(filePath):
+    return os.path.normcase(os.path.abspath(str(filePath)))
+
+
+class BlueprintCache(object):
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _read(self, filePath):
+        from brick.lib import serializers
+        return serializers.readBlueprint(filePath)
+
+    def get(self, filePath):
+        """
+        return parsed blueprint data of filePath, reading the file only when it changed.
+        """
+        key = _cacheKey(filePath)
+        stat = os.stat(key)
+        signature = (stat.st_mtime, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None or entry[0] != signature:
+            data = self._read(key)
+            # keep a pickled copy, unpickling is cheaper than parsing and gives each caller its own data.
+            entry = (signature, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+            with self._lock:
+                self._entries[key] = entry
+
+        return pickle.loads(entry[1])
+
+    def prefetch(self, filePaths, maxWorkers=None):
+        """
+        load filePaths into the cache in parallel threads, returns the parsed data by path.
+        """
+        filePaths = list(OrderedDict.fromkeys(str(each) for each in filePaths))
+        results = OrderedDict()
+        if not filePaths:
+            return results
+
+        with futures.ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+            jobs = OrderedDict((pool.submit(self.get, each), each) for each in filePaths)
+            for job, filePath in jobs.items():
+                try:
+                    results[filePath] = job.result()
+                except Exception as err:
+                    log.warning("cannot prefetch blueprint {0}: {1}".format(filePath, err))
+
+        return results
+
+    def discard(self, filePath):
+        with self._lock:
+            self._entries.pop(_cacheKey(filePath), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_blueprintCache = BlueprintCache()
+
+
+def getBlueprintCache():
+    return _blueprintCache
@@ -0,0 +1,142 @@
+"""per-directory catalog of blueprint summaries.
+
+listing a blueprint directory only needs the name and notes of each blueprint, so instead of parsing every
+.bpt each time, a small index file in the directory keeps one entry per blueprint: name, notes, block count,
+size and mtime. refreshing the catalog stats the directory and reparses only new or changed files.
+"""
+import json
+import os
+from collections import OrderedDict
+from concurrent import futures
+
+from brick.constants import BLUEPRINT_EXTENSION
+from brick.lib import atomicWrite
+
+import logging
+log = logging.getLogger("brick")
+
+CATALOG_FILE_NAME = '.brick_catalog.json'
+CATALOG_VERSION = 1
+
+
+def _summarize(filePath, stat):
+    from brick.lib import serializers
+
+    # the summary sits in the sidecar header, the snapshot is never loaded just to list a directory.
+    summary = serializers.sidecar.readSummary(filePath)
+    if summary is None:
+        with open(filePath, 'r') as fd:
+            data = json.load(fd, object_pairs_hook=OrderedDict)
+        summary = {'notes': data.get('notes') or '', 'blocks': len(data.get('blocks') or [])}
+
+    return OrderedDict([('name', os.path.basename(filePath)),
+                        ('notes', summary.get('notes') or ''),
+                        ('blocks', summary.get('blocks') or 0),
+                        ('size', stat.st_size),
+                        ('mtime', stat.st_mtime)])
+
+
+class Catalog(object):
+    """
+    index of the blueprints in one directory, kept in the catalog file of that directory.
+    """
+    def __init__(self, dirPath):
+        self.dirPath = str(dirPath)
+        self.filePath = os.path.join(self.dirPath, CATALOG_FILE_NAME)
+        self.entries = OrderedDict()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.filePath, 'r') as fd:
+                data = json.load(fd, object_pairs_hook=OrderedDict)
+        except (IOError, OSError, ValueError):
+            return
+
+        if data.get('version') == CATALOG_VERSION:
+            self.entries = data.get('entries') or OrderedDict()
+
+    def save(self):
+        if not self._dirty:
+            return
+
+        try:
+            with atomicWrite(self.filePath, 'w') as fd:
+                json.dump(OrderedDict([('version', CATALOG_VERSION), ('entries', self.entries)]), fd, indent=4)
+            self._dirty = False
+        except (IOError, OSError) as err:
+            # read-only directories are listed without keeping a catalog.
+            log.debug("cannot write blueprint catalog {0}: {1}".format(self.filePath, err))
+
+    def _scan(self):
+        stats = OrderedDict()
+        for fileName in sorted(os.listdir(self.dirPath)):
+            if not fileName.endswith(BLUEPRINT_EXTENSION):
+                continue
+            try:
+                stats[fileName] = os.stat(os.path.join(self.dirPath, fileName))
+            except OSError:
+                continue
+        return stats
+
+    def refresh(self, maxWorkers=None):
+        """
+        bring the catalog up to date with the directory and return the entries, ordered by file name.
+        """
+        if not os.path.isdir(self.dirPath):
+            return []
+
+        stats = self._scan()
+
+        for fileName in list(self.entries):
+            if fileName not in stats:
+                del self.entries[fileName]
+                self._dirty = True
+
+        changed = []
+        for fileName, stat in stats.items():
+            entry = self.entries.get(fileName)
+            if entry is None or entry.get('mtime') != stat.st_mtime or entry.get('size') != stat.st_size:
+                changed.append(fileName)
+
+        if changed:
+            # stat calls are cheap, parsing is what stalls on network shares, so do it in parallel.
+            with futures.ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+                jobs = OrderedDict((fileName, pool.submit(_summarize, os.path.join(self.dirPath, fileName),
+                                                          stats[fileName]))
+                                   for fileName in changed)
+                for fileName, job in jobs.items():
+                    try:
+                        self.entries[fileName] = job.result()
+                    except Exception as err:
+                        log.warning("cannot read blueprint {0}: {1}".format(fileName, err))
+                        # remember broken files too, so they are not reparsed until they change.
+                        stat = stats[fileName]
+                        self.entries[fileName] = OrderedDict([('name', fileName), ('error', str(err)),
+                                                              ('size', stat.st_size), ('mtime', stat.st_mtime)])
+            self._dirty = True
+
+        self.entries = OrderedDict((fileName, self.entries[fileName])
+                                   for fileName in stats if fileName in self.entries)
+        self.save()
+
+        return [entry for entry in self.entries.values() if 'error' not in entry]
+
+    def update(self, filePath):
+        """
+        refresh the entry of a single blueprint file, e.g. right after saving it.
+        """
+        filePath = str(filePath)
+        fileName = os.path.basename(filePath)
+        try:
+            self.entries[fileName] = _summarize(filePath, os.stat(filePath))
+        except (IOError, OSError, ValueError):
+            self.entries.pop(fileName, None)
+        self._dirty = True
+        self.save()
+
+    def remove(self, filePath):
+        if self.entries.pop(os.path.basename(str(filePath)), None) is not None:
+            self._dirty = True
+            self.save()
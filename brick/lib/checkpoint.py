@@ -0,0 +1,111 @@
+"""checkpoint files for long builds.
+
+a checkpoint stores the builder step and, for every block that finished successfully, its picklable
+outputs and runtime attrs, so a build can resume after a failure or a crash.
+"""
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from brick.lib import atomicWrite
+from brick.lib.result_cache import picklable
+
+import logging
+log = logging.getLogger("brick")
+
+CHECKPOINT_EXTENSION = '.ckpt'
+CHECKPOINT_VERSION = 2
+
+
+def getCheckpointPath(blueprintPath):
+    return str(blueprintPath) + CHECKPOINT_EXTENSION
+
+
+class Checkpoint(object):
+    """
+    checkpoint of one build, written to filePath after every successful block.
+
+    the file holds a header followed by one record per finished block. records are appended, so a block
+    costs the same to checkpoint at the end of a long build as at the start.
+    """
+    def __init__(self, filePath, builderUuid=None):
+        self.filePath = str(filePath)
+        self.builderUuid = str(builderUuid) if builderUuid is not None else None
+        self.nextStep = 0
+        # block uuid -> pickled block state, pickled once when the block finishes.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # whether the file holds the header and every entry, records are only appended to such a file.
+        self._synced = False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nextStep = 0
+            self._synced = False
+            if os.path.exists(self.filePath):
+                os.remove(self.filePath)
+
+    def addBlock(self, block, nextStep):
+        state = {'outputs': picklable(block.getOutputs()),
+                 'runTimeAttrs': picklable(block.getLocalRunTimeAttrs())}
+        payload = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._entries[block.uuid] = payload
+            self.nextStep = max(self.nextStep, nextStep)
+            if self._synced:
+                self._append((block.uuid, nextStep, payload))
+            else:
+                self._write()
+
+    def _write(self):
+        header = {'version': CHECKPOINT_VERSION,
+                  'builder': self.builderUuid}
+
+        with atomicWrite(self.filePath) as fd:
+            pickle.dump(header, fd, pickle.HIGHEST_PROTOCOL)
+            for key, payload in self._entries.items():
+                pickle.dump((key, self.nextStep, payload), fd, pickle.HIGHEST_PROTOCOL)
+        self._synced = True
+
+    def _append(self, record):
+        with open(self.filePath, 'ab') as fd:
+            pickle.dump(record, fd, pickle.HIGHEST_PROTOCOL)
+
+    def finishedBlocks(self):
+        """
+        return a dict of block uuid -> state of the blocks that finished successfully.
+        """
+        with self._lock:
+            return OrderedDict((key, pickle.loads(payload)) for key, payload in self._entries.items())
+
+    @classmethod
+    def read(cls, filePath):
+        filePath = str(filePath)
+        with open(filePath, 'rb') as fd:
+            try:
+                header = pickle.load(fd)
+            except Exception:
+                raise ValueError("invalid checkpoint file {0}".format(filePath))
+
+            if not isinstance(header, dict) or header.get('version') != CHECKPOINT_VERSION:
+                raise ValueError("unsupported checkpoint version in {0}".format(filePath))
+
+            checkpoint = cls(filePath, builderUuid=header.get('builder'))
+            checkpoint._synced = True
+
+            size = os.fstat(fd.fileno()).st_size
+            while fd.tell() < size:
+                try:
+                    key, nextStep, payload = pickle.load(fd)
+                except Exception:
+                    # a record cut short by a crash, keep the blocks before it and rewrite the file on the next block.
+                    log.warning("checkpoint {0} is truncated, ignoring its last record".format(filePath))
+                    checkpoint._synced = False
+                    break
+                checkpoint._entries[key] = payload
+                checkpoint.nextStep = max(checkpoint.nextStep, nextStep)
+
+        return checkpoint
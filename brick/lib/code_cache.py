@@ -0,0 +1,130 @@
+"""cache of compiled code objects for scripts run through exec.
+
+ScriptBlock and NamedObject attrs exec the same sources over and over. compiled code objects are kept
+in an LRU keyed by a hash of the source, and can optionally be persisted as marshalled code under the
+brick settings directory so later processes skip compiling too.
+"""
+import hashlib
+import marshal
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    from importlib.util import MAGIC_NUMBER
+except ImportError:
+    import imp
+    MAGIC_NUMBER = imp.get_magic()
+
+from brick.lib import atomicWrite
+
+import logging
+log = logging.getLogger("brick")
+
+
+class CodeCache(object):
+    def __init__(self, maxSize=256, persistDir=None):
+        self.maxSize = maxSize
+        self.persistDir = persistDir
+        self._codes = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source, filename, mode):
+        if not isinstance(source, bytes):
+            source = source.encode('utf-8')
+        digest = hashlib.sha1(source)
+        digest.update('\0{0}\0{1}'.format(filename, mode).encode('utf-8'))
+        return digest.hexdigest()
+
+    def compile(self, source, filename='<string>', mode='exec'):
+        key = self.key(source, filename, mode)
+
+        with self._lock:
+            code = self._codes.pop(key, None)
+            if code is not None:
+                self._codes[key] = code
+                return code
+
+        code = self._loadPersisted(key)
+        if code is None:
+            code = compile(source, filename, mode)
+            self._persist(key, code)
+
+        with self._lock:
+            self._codes[key] = code
+            while len(self._codes) > self.maxSize:
+                self._codes.popitem(last=False)
+
+        return code
+
+    def clear(self):
+        with self._lock:
+            self._codes.clear()
+
+    def _persistPath(self, key):
+        return os.path.join(self.persistDir, key + '.bin')
+
+    def _loadPersisted(self, key):
+        if not self.persistDir:
+            return None
+
+        path = self._persistPath(key)
+        try:
+            with open(path, 'rb') as fd:
+                data = fd.read()
+        except (IOError, OSError):
+            return None
+
+        if data[:len(MAGIC_NUMBER)] != MAGIC_NUMBER:
+            # written by another python version.
+            return None
+
+        try:
+            return marshal.loads(data[len(MAGIC_NUMBER):])
+        except (EOFError, ValueError, TypeError):
+            log.warning("invalid code cache file: {0}".format(path))
+            return None
+
+    def _persist(self, key, code):
+        if not self.persistDir:
+            return
+
+        path = self._persistPath(key)
+        try:
+            if not os.path.isdir(self.persistDir):
+                os.makedirs(self.persistDir)
+            with atomicWrite(path) as fd:
+                fd.write(MAGIC_NUMBER)
+                fd.write(marshal.dumps(code))
+        except (IOError, OSError) as err:
+            log.debug("cannot write code cache file {0}: {1}".format(path, err))
+
+
+_codeCache = CodeCache()
+
+
+def getCodeCache():
+    return _codeCache
+
+
+def compileSource(source, filename='<string>', mode='exec'):
+    """
+    return the compiled code object of source, compiling it only on cache miss.
+    """
+    return _codeCache.compile(source, filename=filename, mode=mode)
+
+
+def setPersistent(enabled=True, persistDir=None):
+    """
+    persist compiled code under the brick settings directory, or persistDir if given.
+    """
+    if not enabled:
+        _codeCache.persistDir = None
+        return
+
+    if persistDir is None:
+        from brick import settings
+        persistDir = str(settings.getSettingsDir() / "code_cache")
+
+    _codeCache.persistDir = persistDir
@@ -0,0 +1,119 @@
+"""content-hash memoization of block outputs.
+
+a block's key combines its canonical dump(), the global attrs it received for the run and the keys of
+the blocks it reads Input attrs from. a block whose key is already stored gets its outputs restored
+instead of being executed.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+from brick.lib import atomicWrite
+
+import logging
+log = logging.getLogger("brick")
+
+
+def _canonical(data):
+    # repr fallback keeps unknown objects in the key, at worst they cause a cache miss.
+    return json.dumps(data, sort_keys=True, default=repr)
+
+
+def picklable(data):
+    """
+    return the items of data whose values can be pickled.
+    """
+    result = {}
+    for key, val in data.items():
+        try:
+            pickle.dumps(val, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            log.debug("{0} cannot be pickled, left out".format(key))
+            continue
+        result[key] = val
+    return result
+
+
+def blockKey(block, globalValues, upstreamKeys):
+    """
+    return the cache key of a block.
+
+    :param block: Block object
+    :param globalValues: dict of evaluated global attrs the block runs with
+    :param upstreamKeys: keys of the Input upstream blocks, in declaration order
+    """
+    digest = hashlib.sha1()
+    digest.update(_canonical(block.dump()).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(_canonical(globalValues).encode('utf-8'))
+    for key in upstreamKeys:
+        digest.update(b'\0')
+        digest.update(key.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """
+    store of pickled block outputs, in memory and optionally in cacheDir.
+    """
+    def __init__(self, cacheDir=None):
+        self.cacheDir = cacheDir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entryPath(self, key):
+        return os.path.join(self.cacheDir, key + '.pkl')
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+
+        if data is None and self.cacheDir:
+            try:
+                with open(self._entryPath(key), 'rb') as fd:
+                    data = fd.read()
+            except (IOError, OSError):
+                return None
+
+        if data is None:
+            return None
+
+        try:
+            return pickle.loads(data)
+        except Exception:
+            log.warning("invalid result cache entry: {0}".format(key))
+            return None
+
+    def set(self, key, outputs):
+        """
+        store outputs. nothing is stored when one of them cannot be pickled, restoring only part of the
+        outputs would hand a block marked as successful to its downstream with attributes missing.
+        return whether the outputs were stored.
+        """
+        try:
+            data = pickle.dumps(dict(outputs), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            dropped = sorted(set(outputs) - set(picklable(outputs)))
+            log.debug("outputs not cached, cannot be pickled: {0}".format(', '.join(dropped)))
+            return False
+
+        with self._lock:
+            self._entries[key] = data
+
+        if self.cacheDir:
+            path = self._entryPath(key)
+            try:
+                if not os.path.isdir(self.cacheDir):
+                    os.makedirs(self.cacheDir)
+                with atomicWrite(path) as fd:
+                    fd.write(data)
+            except (IOError, OSError) as err:
+                log.debug("cannot write result cache file {0}: {1}".format(path, err))
+
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
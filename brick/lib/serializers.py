@@ -0,0 +1,255 @@
+"""blueprint serializers and the binary sidecar cache.
+
+the .bpt json file stays the source of truth. next to it a sidecar file (.bptc) keeps a marshalled
+snapshot of the parsed blueprint, tagged with the mtime and size of the .bpt it was made from. loading
+uses the sidecar while it is fresh and falls back to the json file otherwise, rewriting the sidecar on
+the way.
+
+blueprint folders are often shared, so the sidecar only ever holds plain data: attr types stay names
+and are resolved through the attr_type registry on load, and nothing in the file can create objects.
+"""
+import json
+import marshal
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+from brick import attr_type
+from brick.lib import atomicWrite
+
+import logging
+log = logging.getLogger("brick")
+
+
+class Serializer(object):
+    """
+    base class of blueprint serializers, converting blueprint data to and from bytes.
+    """
+    name = None
+    binary = False
+
+    def dumps(self, data):
+        raise NotImplementedError
+
+    def loads(self, raw):
+        raise NotImplementedError
+
+    def read(self, filePath):
+        with open(str(filePath), 'rb' if self.binary else 'r') as fd:
+            return self.loads(fd.read())
+
+    def write(self, data, filePath):
+        with open(str(filePath), 'wb' if self.binary else 'w') as fd:
+            fd.write(self.dumps(data))
+
+
+class JsonSerializer(Serializer):
+    name = 'json'
+
+    def dumps(self, data):
+        return json.dumps(data, indent=4)
+
+    def loads(self, raw):
+        return json.loads(raw, object_pairs_hook=OrderedDict)
+
+
+class PickleSerializer(Serializer):
+    name = 'pickle'
+    binary = True
+
+    def dumps(self, data):
+        return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, raw):
+        return pickle.loads(raw)
+
+
+def _plainData(data):
+    if isinstance(data, dict):
+        return dict((key, _plainData(val)) for key, val in data.items())
+    if isinstance(data, list):
+        return [_plainData(val) for val in data]
+    return data
+
+
+def _orderedData(data):
+    if isinstance(data, dict):
+        return OrderedDict((key, _orderedData(val)) for key, val in data.items())
+    if isinstance(data, list):
+        return [_orderedData(val) for val in data]
+    return data
+
+
+# dicts keep their insertion order from python 3.7 on, before that marshalled dicts need an ordered copy.
+_dictsOrdered = sys.version_info >= (3, 7)
+
+
+class MarshalSerializer(Serializer):
+    """
+    plain data only, the json types. dicts keep their order, but are plain dicts on python 3.7 and later.
+    """
+    name = 'marshal'
+    binary = True
+
+    def dumps(self, data):
+        return marshal.dumps(_plainData(data))
+
+    def loads(self, raw):
+        data = marshal.loads(raw)
+        return data if _dictsOrdered else _orderedData(data)
+
+
+_serializers = {}
+
+
+def registerSerializer(serializer):
+    _serializers[serializer.name] = serializer
+
+
+def getSerializer(name):
+    try:
+        return _serializers[name]
+    except KeyError:
+        raise ValueError("unknown serializer: {0}".format(name))
+
+
+registerSerializer(JsonSerializer())
+registerSerializer(PickleSerializer())
+registerSerializer(MarshalSerializer())
+
+
+def _resolveAttrs(attrs):
+    resolved = OrderedDict()
+    for attrName, typeVal in attrs.items():
+        # old format without attrType, see Block.load
+        if not isinstance(typeVal, (list, tuple)):
+            typeVal = (attr_type.guessNameFromValue(typeVal), typeVal)
+        # plain tuples pickle smaller and faster than attr records, blocks wrap them again on load.
+        resolved[attrName] = tuple(attr_type.decodeAttr(typeVal))
+    return resolved
+
+
+def resolveAttrTypes(data):
+    """
+    return a copy of blueprint data with every attr type name replaced by its attr_type class.
+    """
+    resolved = OrderedDict(data)
+    resolved['attrs'] = _resolveAttrs(data.get('attrs') or {})
+
+    blocks = []
+    for blockData in data.get('blocks') or []:
+        blockData = OrderedDict(blockData)
+        blockData['attrs'] = _resolveAttrs(blockData.get('attrs') or {})
+        blocks.append(blockData)
+    resolved['blocks'] = blocks
+
+    return resolved
+
+
+class Sidecar(object):
+    """
+    binary snapshot stored next to a blueprint, valid while the blueprint mtime and size match.
+    the snapshot is the blueprint data as parsed from json, attr types are resolved by the caller.
+    """
+    extension = '.bptc'
+    magic = b'BRICKSIDECAR2\n'
+
+    def __init__(self, serializer='marshal'):
+        self.serializer = serializer
+
+    def path(self, filePath):
+        return os.path.splitext(str(filePath))[0] + self.extension
+
+    @staticmethod
+    def signature(filePath):
+        stat = os.stat(str(filePath))
+        return {'mtime': stat.st_mtime, 'size': stat.st_size}
+
+    def _readHeader(self, fd, filePath):
+        if fd.readline() != self.magic:
+            return None
+        header = json.loads(fd.readline().decode('utf-8'))
+        if header.get('source') != self.signature(filePath):
+            return None
+        return header
+
+    def read(self, filePath):
+        """
+        return the snapshot data of filePath, or None when the sidecar is missing or stale.
+        """
+        sidecarPath = self.path(filePath)
+        try:
+            with open(sidecarPath, 'rb') as fd:
+                header = self._readHeader(fd, filePath)
+                # only the configured serializer is trusted, never the one a file asks for.
+                if header is None or header.get('serializer') != self.serializer:
+                    return None
+                serializer = getSerializer(self.serializer)
+                return serializer.loads(fd.read())
+        except (IOError, OSError, ValueError):
+            return None
+        except Exception as err:
+            log.debug("cannot read sidecar {0}: {1}".format(sidecarPath, err))
+            return None
+
+    def readSummary(self, filePath):
+        """
+        return the notes and block count kept in the sidecar header of filePath, without loading the snapshot.
+        return None when the sidecar is missing, stale or has no summary.
+        """
+        try:
+            with open(self.path(filePath), 'rb') as fd:
+                header = self._readHeader(fd, filePath)
+        except (IOError, OSError, ValueError):
+            return None
+        return header.get('summary') if header is not None else None
+
+    def write(self, filePath, data):
+        sidecarPath = self.path(filePath)
+        try:
+            serializer = getSerializer(self.serializer)
+            header = {'serializer': serializer.name, 'source': self.signature(filePath),
+                      # listing a directory only needs this, see readSummary.
+                      'summary': {'notes': data.get('notes') or '', 'blocks': len(data.get('blocks') or [])}}
+            payload = serializer.dumps(data)
+            if not isinstance(payload, bytes):
+                payload = payload.encode('utf-8')
+            with atomicWrite(sidecarPath) as fd:
+                fd.write(self.magic)
+                fd.write((json.dumps(header) + '\n').encode('utf-8'))
+                fd.write(payload)
+        except Exception as err:
+            # read-only blueprint directories simply go without a sidecar.
+            log.debug("cannot write sidecar {0}: {1}".format(sidecarPath, err))
+
+
+sidecar = Sidecar()
+sidecarEnabled = True
+
+
+def readBlueprint(filePath):
+    """
+    return parsed blueprint data with attr types resolved, from the sidecar when it is fresh.
+    """
+    data = sidecar.read(filePath) if sidecarEnabled else None
+    if data is None:
+        data = getSerializer('json').read(filePath)
+        if sidecarEnabled:
+            sidecar.write(filePath, data)
+
+    return resolveAttrTypes(data)
+
+
+def writeBlueprint(filePath, data):
+    """
+    write blueprint data as json, and refresh its sidecar.
+    """
+    serializer = getSerializer('json')
+    raw = serializer.dumps(data)
+    with open(str(filePath), 'w') as fd:
+        fd.write(raw)
+
+    if sidecarEnabled:
+        # snapshot what the json round trip gives back (lists, not tuples), same as a later load would.
+        sidecar.write(filePath, serializer.loads(raw))
@@ -0,0 +1,115 @@
+"""streaming outputs between blocks.
+
+a block can set a Stream as an output attribute instead of a full list. the stream pulls from its
+iterable on a background thread into a bounded buffer, and a downstream block reading it through an
+Input attr consumes the items lazily while the producer keeps going. when the buffer is full the
+producer waits, so the intermediate data is never held in memory as a whole.
+
+streams live in the process that created them, they cannot be sent to ProcessExecutor workers or be
+stored in the result cache.
+"""
+import sys
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import logging
+log = logging.getLogger("brick")
+
+
+class StreamError(Exception):
+    pass
+
+
+class _Failure(object):
+    def __init__(self, excInfo):
+        self.excInfo = excInfo
+
+
+class Stream(object):
+    """
+    single-consumer iterator fed by a producer thread through a bounded buffer.
+
+    :param iterable: generator or any iterable producing the items
+    :param bufferSize: maximum number of items produced ahead of the consumer
+    :param name: label used in the thread name and in error messages
+    """
+    _end = object()
+    # seconds between checks of the closed flag while the producer waits on a full buffer.
+    pollInterval = 0.1
+
+    def __init__(self, iterable, bufferSize=64, name=None):
+        self.name = name or 'stream'
+        self.bufferSize = bufferSize
+        self._iterable = iterable
+        self._queue = queue.Queue(maxsize=max(1, bufferSize))
+        self._thread = None
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._consumed = False
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._produce, name='brick-{0}'.format(self.name))
+                self._thread.daemon = True
+                self._thread.start()
+        return self
+
+    def _put(self, item):
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=self.pollInterval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            for item in self._iterable:
+                if not self._put(item):
+                    return
+        except Exception:
+            self._put(_Failure(sys.exc_info()))
+            return
+        self._put(self._end)
+
+    def __iter__(self):
+        with self._lock:
+            if self._consumed:
+                raise StreamError("{0} can only be consumed once".format(self.name))
+            self._consumed = True
+
+        self.start()
+        return self._consume()
+
+    def _consume(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._end:
+                    return
+                if isinstance(item, _Failure):
+                    # re-raise the producer error in the consumer.
+                    raise item.excInfo[1]
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        stop the producer, items not consumed yet are dropped.
+        """
+        self._closed.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def __reduce__(self):
+        raise TypeError("{0} cannot be pickled".format(self.name))
@@ -0,0 +1,115 @@
+"""per-block tracing in Chrome Trace Event format.
+
+a Tracer records start and end time, process and thread id, build status and nesting depth of every
+block it sees, including blocks of nested BuilderBlock runs. write() saves the records as Chrome Trace
+Event json, which opens in Perfetto or chrome://tracing.
+"""
+import json
+import os
+import threading
+import time
+
+from brick.constants import BuildStatus
+
+_statusNames = dict((val, key) for key, val in vars(BuildStatus).items() if not key.startswith('_'))
+
+
+class Tracer(object):
+    def __init__(self):
+        self.records = []
+        self.origin = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._threadNames = {}
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def currentDepth(self):
+        return len(self._stack())
+
+    def begin(self, block, builder=None, push=True):
+        """
+        mark the start of a block on the current thread, returns a token to pass to end().
+
+        blocks started while another one is running on the same thread are nested under it. tasks
+        interleaving on one event loop thread should not push.
+        """
+        stack = self._stack()
+        token = {'name': block.name,
+                 'type': block.__class__.__name__,
+                 'builder': builder.name if builder is not None else None,
+                 'depth': len(stack),
+                 'start': time.time()}
+        if push:
+            stack.append(token)
+        return token
+
+    def end(self, token, block):
+        stack = self._stack()
+        for idx in range(len(stack) - 1, -1, -1):
+            if stack[idx] is token:
+                del stack[idx]
+                break
+
+        thread = threading.current_thread()
+        self.record(token['name'], token['type'], token['start'], time.time(),
+                    status=block.buildStatus, depth=token['depth'], builderName=token['builder'],
+                    pid=os.getpid(), tid=thread.ident, threadName=thread.name)
+
+    def record(self, name, blockType, start, end, status=None, depth=0, builderName=None, pid=None, tid=None,
+               threadName=None):
+        """
+        add a finished block, for blocks measured elsewhere such as in worker processes.
+        """
+        data = {'name': name,
+                'type': blockType,
+                'start': start,
+                'end': end,
+                'status': _statusNames.get(status, status),
+                'depth': depth,
+                'builder': builderName,
+                'pid': pid if pid is not None else os.getpid(),
+                'tid': tid if tid is not None else threading.current_thread().ident}
+
+        with self._lock:
+            self.records.append(data)
+            if threadName:
+                self._threadNames[(data['pid'], data['tid'])] = threadName
+
+    def toChromeTrace(self):
+        with self._lock:
+            records = list(self.records)
+            threadNames = dict(self._threadNames)
+
+        events = []
+        for (pid, tid), threadName in sorted(threadNames.items()):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': threadName}})
+
+        for data in records:
+            events.append({'name': data['name'],
+                           'cat': data['type'],
+                           'ph': 'X',
+                           'ts': (data['start'] - self.origin) * 1e6,
+                           'dur': max(0.0, data['end'] - data['start']) * 1e6,
+                           'pid': data['pid'],
+                           'tid': data['tid'],
+                           'args': {'status': data['status'],
+                                    'builder': data['builder'],
+                                    'depth': data['depth']}})
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, filePath):
+        with open(str(filePath), 'w') as fd:
+            json.dump(self.toChromeTrace(), fd)
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+            self._threadNames = {}
+        self.origin = time.time()
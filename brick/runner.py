@@ -0,0 +1,259 @@
+"""headless runner for blueprints.
+
+runs a blueprint without importing brick.ui or any Qt binding, for farm nodes and CI.
+
+python api:
+    result = runner.run("rig.bpt", attrs={"character": "bob"})
+    sys.exit(result.exitCode)
+
+command line:
+    brick run rig.bpt --attr character=bob --attr lod=1 --report result.json
+"""
+import argparse
+import json
+import sys
+import time
+from collections import OrderedDict
+
+from brick import base
+from brick import attr_type
+from brick.constants import BuildStatus
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+EXIT_ERROR = 2
+
+_statusNames = dict((val, key) for key, val in vars(BuildStatus).items() if not key.startswith('_'))
+
+
+class BlockResult(object):
+    def __init__(self, name, blockType, status, duration=None):
+        self.name = name
+        self.type = blockType
+        self.status = status
+        self.duration = duration
+
+    def toDict(self):
+        return OrderedDict([('name', self.name),
+                            ('type', self.type),
+                            ('status', self.status),
+                            ('duration', self.duration)])
+
+
+class RunResult(object):
+    """
+    outcome of a headless run: overall status, per-block status and timings and the process exit code.
+    """
+    def __init__(self, blueprint):
+        self.blueprint = blueprint
+        self.status = 'nothing'
+        self.error = None
+        self.duration = None
+        self.blocks = []
+
+    @property
+    def exitCode(self):
+        if self.error is not None:
+            return EXIT_ERROR
+        return EXIT_SUCCESS if self.status == 'success' else EXIT_FAILURE
+
+    def toDict(self):
+        return OrderedDict([('blueprint', self.blueprint),
+                            ('status', self.status),
+                            ('exitCode', self.exitCode),
+                            ('error', self.error),
+                            ('duration', self.duration),
+                            ('blocks', [each.toDict() for each in self.blocks])])
+
+
+def _toBool(value):
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off', ''):
+        return False
+    raise ValueError("cannot convert {0!r} to Bool".format(value))
+
+
+_converters = {
+    attr_type.Int: int,
+    attr_type.Float: float,
+    attr_type.Bool: _toBool,
+    attr_type.List: json.loads,
+    attr_type.Dict: lambda value: json.loads(value, object_pairs_hook=OrderedDict),
+}
+
+
+def parseAttrArgs(pairs):
+    """
+    turn a list of "key=value" strings into an ordered dict.
+    """
+    attrs = OrderedDict()
+    for pair in pairs or []:
+        if '=' not in pair:
+            raise ValueError("attr override must be key=value, got {0!r}".format(pair))
+        key, value = pair.split('=', 1)
+        attrs[key.strip()] = value
+    return attrs
+
+
+def applyAttrOverrides(builder, attrs):
+    """
+    set global attrs on builder. string values are converted to the type of the existing header attr,
+    attrs not in the header are added as String.
+    """
+    for key, value in attrs.items():
+        attrType = builder.attrs[key][0] if key in builder.attrs else attr_type.String
+        builder.setAttr(key, (attrType, convertAttrValue(attrType, value)))
+
+
+def convertAttrValue(attrType, value):
+    if isinstance(value, (str, base.unicode)):
+        converter = _converters.get(attrType)
+        if converter is not None:
+            return converter(value)
+    return value
+
+
+def _createExecutor(name, workers=None):
+    if not name or name == 'serial':
+        return None
+    if name == 'thread':
+        from brick.executors import ThreadExecutor
+        return ThreadExecutor(maxWorkers=workers)
+    if name == 'process':
+        from brick.executors import ProcessExecutor
+        return ProcessExecutor(maxWorkers=workers)
+    if name == 'async':
+        from brick.aio import AsyncExecutor
+        return AsyncExecutor(maxWorkers=workers)
+    raise ValueError("unknown executor: {0}".format(name))
+
+
+def collectResult(builder, result):
+    durations = {}
+    if builder.tracer is not None:
+        for record in builder.tracer.records:
+            if record['builder'] == builder.name and record['depth'] == 0:
+                durations[record['name']] = record['end'] - record['start']
+
+    failed = False
+    for block in builder.blocks:
+        if not block.active:
+            continue
+        status = _statusNames.get(block.buildStatus, block.buildStatus)
+        result.blocks.append(BlockResult(block.name, block.__class__.__name__, status,
+                                         durations.get(block.name)))
+        if block.buildStatus != BuildStatus.success:
+            failed = True
+
+    result.status = 'fail' if failed else 'success'
+    return result
+
+
+def runBuilder(builder, executor=None, traceFile=None, blueprint=None):
+    """
+    run an already loaded builder from its first block and return a RunResult.
+    """
+    result = RunResult(blueprint or builder.blueprintPath)
+    tracer = builder.enableTracing()
+
+    stime = time.time()
+    builder.reset()
+    builder.fastForward(executor=executor)
+    result.duration = time.time() - stime
+
+    if traceFile:
+        tracer.write(traceFile)
+
+    return collectResult(builder, result)
+
+
+def run(blueprint, attrs=None, executor=None, workers=None, traceFile=None):
+    """
+    load and run a blueprint headlessly.
+
+    :param blueprint: blueprint path, or name in the blueprint directory
+    :param attrs: dict of global attr overrides, string values are converted to the header attr type
+    :param executor: executor object, or one of "serial", "thread", "process", "async"
+    :param workers: worker count for the thread and process executors
+    :param traceFile: optional path of a Chrome Trace Event json to write
+    :return: RunResult
+    """
+    result = RunResult(str(blueprint))
+    try:
+        builder = base.GenericBuilder.loadBlueprint(blueprint)
+        applyAttrOverrides(builder, attrs or {})
+        if executor is None or isinstance(executor, (str, base.unicode)):
+            executor = _createExecutor(executor, workers)
+    except Exception as err:
+        result.error = '{0}: {1}'.format(err.__class__.__name__, err)
+        result.status = 'error'
+        return result
+
+    return runBuilder(builder, executor=executor, traceFile=traceFile, blueprint=str(blueprint))
+
+
+def printResult(result, stream=None):
+    stream = stream or sys.stdout
+    if result.error:
+        stream.write('error: {0}\n'.format(result.error))
+        return
+
+    for block in result.blocks:
+        duration = '' if block.duration is None else '{0:.3f}s'.format(block.duration)
+        stream.write('{0:<8} {1:>10}  {2}\n'.format(block.status, duration, block.name))
+    stream.write('{0} in {1:.3f}s\n'.format(result.status, result.duration or 0.0))
+
+
+def _addRunArguments(parser):
+    parser.add_argument('blueprint', help='blueprint path, or name in the blueprint directory')
+    parser.add_argument('--attr', action='append', default=[], metavar='KEY=VALUE',
+                        help='override a global attr, can be repeated')
+    parser.add_argument('--executor', default='serial', choices=('serial', 'thread', 'process', 'async'))
+    parser.add_argument('--workers', type=int, default=None, help='worker count for parallel executors')
+    parser.add_argument('--trace', help='write a Chrome Trace Event json to this path')
+    parser.add_argument('--report', help='write the result as json to this path')
+
+
+def createParser():
+    parser = argparse.ArgumentParser(prog='brick', description='run brick blueprints without ui')
+    subparsers = parser.add_subparsers(dest='command')
+    _addRunArguments(subparsers.add_parser('run', help='run a blueprint'))
+
+    from brick import sweep
+    sweep.addArguments(subparsers.add_parser('sweep', help='run a blueprint once per attr set of a table'))
+    return parser
+
+
+def runCommand(args):
+    try:
+        attrs = parseAttrArgs(args.attr)
+    except ValueError as err:
+        sys.stderr.write('error: {0}\n'.format(err))
+        return EXIT_ERROR
+
+    result = run(args.blueprint, attrs=attrs, executor=args.executor, workers=args.workers,
+                 traceFile=args.trace)
+
+    printResult(result)
+
+    if args.report:
+        with open(args.report, 'w') as fd:
+            json.dump(result.toDict(), fd, indent=4)
+
+    return result.exitCode
+
+
+def main(argv=None):
+    parser = createParser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        return runCommand(args)
+
+    if args.command == 'sweep':
+        from brick import sweep
+        return sweep.runCommand(args)
+
+    parser.print_help()
+    return EXIT_ERROR
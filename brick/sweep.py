@@ -0,0 +1,163 @@
+"""parameter sweeps: one blueprint run with many sets of global attrs.
+
+the blueprint is read and validated once, then every variant runs on a fresh builder in a pool of
+worker processes (or threads). variants come from a csv table, where the header row holds the attr
+names, or from json lines, one object per variant.
+
+command line:
+    brick sweep rig.bpt variants.csv --workers 8 --report sweep.json
+"""
+import csv
+import json
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from concurrent import futures
+
+from brick import base
+from brick import attr_type
+from brick import runner
+from brick.lib import serializers
+
+# parsed blueprint data of the running sweep, set once per worker.
+_sweepData = None
+_sweepBlueprint = None
+
+
+def readVariants(filePath):
+    """
+    return the list of attr dicts from a csv file or a json lines file (.jsonl, .json).
+    """
+    filePath = str(filePath)
+    with open(filePath, 'r') as fd:
+        if filePath.lower().endswith('.csv'):
+            return [OrderedDict((key, value) for key, value in row.items() if key)
+                    for row in csv.DictReader(fd)]
+
+        variants = []
+        for lineNo, line in enumerate(fd, 1):
+            line = line.strip()
+            if not line:
+                continue
+            variant = json.loads(line, object_pairs_hook=OrderedDict)
+            if not isinstance(variant, dict):
+                raise ValueError("{0}:{1}: variant must be a json object".format(filePath, lineNo))
+            variants.append(variant)
+        return variants
+
+
+def _initWorker(data, blueprint):
+    global _sweepData, _sweepBlueprint
+    _sweepData = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+    _sweepBlueprint = blueprint
+
+
+def _runVariant(index, attrs):
+    stime = time.time()
+    try:
+        builder = base.Builder.load(pickle.loads(_sweepData))
+        builder.blueprintPath = _sweepBlueprint
+        runner.applyAttrOverrides(builder, attrs)
+        result = runner.runBuilder(builder, blueprint=_sweepBlueprint)
+    except Exception as err:
+        result = runner.RunResult(_sweepBlueprint)
+        result.status = 'error'
+        result.error = '{0}: {1}'.format(err.__class__.__name__, err)
+        result.duration = time.time() - stime
+
+    report = result.toDict()
+    report['index'] = index
+    report['attrs'] = attrs
+    return report
+
+
+def _createPool(mode, workers, data, blueprint):
+    if mode == 'process':
+        from brick.executors import getProcessContext
+        return futures.ProcessPoolExecutor(max_workers=workers, mp_context=getProcessContext(),
+                                           initializer=_initWorker, initargs=(data, blueprint))
+
+    _initWorker(data, blueprint)
+    return futures.ThreadPoolExecutor(max_workers=1 if mode == 'serial' else workers)
+
+
+def runSweep(blueprint, variants, workers=None, mode='process'):
+    """
+    run a blueprint once per variant and return the sweep report.
+
+    :param blueprint: blueprint path, or name in the blueprint directory
+    :param variants: list of dicts of global attr overrides
+    :param workers: pool size, defaults to the number of cpus
+    :param mode: "process", "thread" or "serial"
+    :return: OrderedDict report with one entry per variant, in variant order
+    """
+    if mode not in ('process', 'thread', 'serial'):
+        raise ValueError("unknown sweep mode: {0}".format(mode))
+
+    filePath = str(base.Builder.resolveBlueprintPath(blueprint))
+    data = serializers.readBlueprint(filePath)
+
+    # validate once up front instead of failing in every worker.
+    header = base.Builder.load(data).attrs
+    for index, variant in enumerate(variants):
+        for key, value in variant.items():
+            attrType = header[key][0] if key in header else attr_type.String
+            try:
+                runner.convertAttrValue(attrType, value)
+            except ValueError as err:
+                raise ValueError("variant {0}, attr {1}: {2}".format(index, key, err))
+
+    stime = time.time()
+    results = [None] * len(variants)
+    pool = _createPool(mode, workers, data, filePath)
+    try:
+        jobs = dict((pool.submit(_runVariant, index, variant), index) for index, variant in enumerate(variants))
+        for job in futures.as_completed(jobs):
+            results[jobs[job]] = job.result()
+    finally:
+        pool.shutdown(wait=True)
+
+    succeeded = len([each for each in results if each['status'] == 'success'])
+    return OrderedDict([('blueprint', filePath),
+                        ('mode', mode),
+                        ('variants', len(variants)),
+                        ('succeeded', succeeded),
+                        ('failed', len(variants) - succeeded),
+                        ('duration', time.time() - stime),
+                        ('results', results)])
+
+
+def printReport(report, stream=None):
+    stream = stream or sys.stdout
+    for result in report['results']:
+        attrs = ' '.join('{0}={1}'.format(key, val) for key, val in result['attrs'].items())
+        stream.write('{0:>5} {1:<8} {2:>10.3f}s  {3}\n'.format(result['index'], result['status'],
+                                                             result['duration'] or 0.0, attrs))
+    stream.write('{0}/{1} variants succeeded in {2:.3f}s\n'.format(report['succeeded'], report['variants'],
+                                                                report['duration']))
+
+
+def addArguments(parser):
+    parser.add_argument('blueprint', help='blueprint path, or name in the blueprint directory')
+    parser.add_argument('table', help='csv file or json lines file with one attr set per variant')
+    parser.add_argument('--workers', type=int, default=None, help='pool size, defaults to the cpu count')
+    parser.add_argument('--mode', default='process', choices=('process', 'thread', 'serial'))
+    parser.add_argument('--report', help='write the sweep report as json to this path')
+
+
+def runCommand(args):
+    try:
+        variants = readVariants(args.table)
+        report = runSweep(args.blueprint, variants, workers=args.workers, mode=args.mode)
+    except Exception as err:
+        sys.stderr.write('error: {0}: {1}\n'.format(err.__class__.__name__, err))
+        return runner.EXIT_ERROR
+
+    printReport(report)
+
+    if args.report:
+        with open(args.report, 'w') as fd:
+            json.dump(report, fd, indent=4)
+
+    return runner.EXIT_SUCCESS if not report['failed'] else runner.EXIT_FAILURE
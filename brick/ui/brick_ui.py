@@ -12,12 +12,13 @@ from brick import attr_type
 from brick.base import log, Block
 
 from brick import lib
+from brick.lib.catalog import Catalog
 from brick import settings
-from brick.constants import BuildStatus
 
 from brick.ui import attrField
 from brick.ui import saveLoadBlueprintDialog as ioDialog
 from brick.ui.components import block_widgets
+from brick.ui.components.build_runner import createBuildRunner
 
 from brick.ui import IconManager
 
@@ -115,18 +116,18 @@ class BrickWindow(QtWidgets.QMainWindow):
         self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.editorDock)
         self.editorWidget = self.editorDock.mainWidget
 
-        self.blockListWidget.itemSelectionChanged.connect(self.updateEditorWidget)
+        self.blockListWidget.blockSelectionChanged.connect(self.updateEditorWidget)
+        self.blockListWidget.blockRenamed.connect(self.editorDock.setWindowTitle)
 
     def _initLogDock(self):
         self.logDock = Log_Dock()
         self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.logDock)
 
     def updateEditorWidget(self):
-        items = self.blockListWidget.selectedItems()
+        blocks = self.blockListWidget.selectedBlocks()
 
-        if items:
-            widget = items[0].widget
-            self.editorWidget.update(widget)
+        if blocks:
+            self.editorWidget.update(blocks[0])
         else:
             self.editorWidget.clear()
 
@@ -213,6 +214,7 @@ class BrickWindow(QtWidgets.QMainWindow):
     def saveBluePrint(self, data):
         filePath, notes = data
         self.blueprintWidget.builder.saveBlueprint(filePath, notes)
+        Catalog(os.path.dirname(str(filePath))).update(filePath)
         self.currentBlueprint = filePath
         log.info("Blueprint saved : {}".format(filePath))
         self.updateTitle()
@@ -358,6 +360,7 @@ class BlueprintWidget(QtWidgets.QWidget):
     def __init__(self, parent=None):
         super(BlueprintWidget, self).__init__(parent=parent)
         self._builder = None
+        self.buildRunner = None
         self._initUI()
         self._connectSignals()
 
@@ -415,8 +418,6 @@ class BlueprintWidget(QtWidgets.QWidget):
         self.stepBackButton.clicked.connect(self.stepBack)
         self.stepForwardButton.clicked.connect(self.stepForward)
 
-        self.blockListWidget.currentItemChanged.connect(self.refreshIndicator)
-
         self.blockListWidget.itemOrderChanged.connect(self.itemOrderChanged)
         self.blockListWidget.currentIndexSet.connect(self.setBuilderIndex)
 
@@ -435,12 +436,13 @@ class BlueprintWidget(QtWidgets.QWidget):
     @property
     def builder(self):
         if not self._builder:
-            self._builder = self._createBuilder()
+            self.builder = self._createBuilder()
         return self._builder
 
     @builder.setter
     def builder(self, builder):
         self._builder = builder
+        self.blockListWidget.setBuilder(builder)
 
     def _createBuilder(self):
         builder = base.GenericBuilder()
@@ -452,32 +454,15 @@ class BlueprintWidget(QtWidgets.QWidget):
         return builder
 
     def refreshIndicator(self):
-        for idx, widget in enumerate(self.blockListWidget.blockWidgets):
-            if idx == self.nextStep:
-                widget.switchIndicator(BuildStatus.next)
-                try:
-                    status = self.builder.blocks[idx].buildStatus
-                    if status == BuildStatus.fail:
-                        widget.switchIndicator(status)
-                except (IndexError, AttributeError):
-                    return
-
-            else:
-                try:
-                    status = self.builder.blocks[idx].buildStatus
-                    widget.switchIndicator(status)
-                except (IndexError, AttributeError):
-                    widget.switchIndicator(BuildStatus.nothing)
+        self.blockListWidget.refreshIndicator(self.nextStep)
 
     def setBuilderIndex(self, index):
         self.builder.nextStep = index
         self.refreshIndicator()
 
     def syncBuilder(self):
+        # the block list edits builder.blocks in place, only the header needs syncing.
         self.refreshHeaderAttrs()
-        blockOrders = [wg.block.name for wg in self.blockListWidget.blockWidgets]
-
-        self.builder.syncOrder(blockOrders)
 
     def itemOrderChanged(self):
         self.syncBuilder()
@@ -488,19 +473,13 @@ class BlueprintWidget(QtWidgets.QWidget):
         try:
             nextStep = self.builder.nextStep
         except AttributeError:
-            if not self.blockListWidget.blockWidgets:
+            if not self.blockListWidget.count():
                 return
             else:
                 nextStep = 0
 
         return nextStep
 
-    @property
-    def nextWidget(self):
-        for idx, widget in enumerate(self.blockListWidget.blockWidgets):
-            if idx == self.nextStep:
-                return widget
-
     def rewind(self):
         self.builder.reset()
         self.refreshIndicator()
@@ -512,7 +491,7 @@ class BlueprintWidget(QtWidgets.QWidget):
         self.refreshIndicator()
 
     def stepForward(self):
-        if self.builder.nextStep < len(self.blockListWidget.blockWidgets):
+        if self.builder.nextStep < self.blockListWidget.count():
             self.builder.nextStep += 1
         self.refreshIndicator()
 
@@ -524,33 +503,61 @@ class BlueprintWidget(QtWidgets.QWidget):
     def buildNext(self):
         ret = self.builder.buildNext()
         self.refreshIndicator()
-        if self.nextWidget:
-            self.blockListWidget.setCurrentItem(self.nextWidget.item)
+        if self.nextStep is not None and self.nextStep < self.blockListWidget.count():
+            self.blockListWidget.setCurrentRow(self.nextStep)
 
         return ret
 
     def fastForward(self):
-        progressDialog = QtWidgets.QProgressDialog("Running...", "Abort", 0, 100, self)
+        if self.buildRunner is not None and self.buildRunner.isRunning():
+            return
+
+        builder = self.builder
+        progressDialog = QtWidgets.QProgressDialog("Running...", "Abort", builder.nextStep, len(builder.blocks), self)
+        progressDialog.setWindowModality(QtCore.Qt.WindowModal)
+        progressDialog.setAutoReset(False)
+        progressDialog.setAutoClose(False)
+
+        # a worker thread, or stepping on the gui thread for hosts that need it, see build_runner.getHostScheduler.
+        runner = createBuildRunner(builder, parent=self)
+        runner.progressed.connect(partial(self.buildProgressed, progressDialog))
+        runner.buildFinished.connect(partial(self.buildFinished, progressDialog))
+        progressDialog.canceled.connect(runner.requestInterruption)
+
+        # the blocks are being run, keep them from being edited until the build is done.
+        self.setBuildControlsEnabled(False)
+        self.buildRunner = runner
+        runner.start()
         progressDialog.show()
-        progress = 0
 
-        while True:
-            ret = self.buildNext()
-            progress += 1
-            progressDialog.setValue(progress)
-            if ret == BuildStatus.fail or ret == BuildStatus.end:
-                break
+    def buildProgressed(self, progressDialog, step, total):
+        progressDialog.setMaximum(total)
+        progressDialog.setValue(step)
+        self.refreshIndicator()
 
-        progressDialog.setValue(100)
+    def buildFinished(self, progressDialog, status):
+        progressDialog.close()
+        self.buildRunner.wait()
+        self.buildRunner.deleteLater()
+        self.buildRunner = None
+        self.setBuildControlsEnabled(True)
+
+        self.refreshIndicator()
+        if self.nextStep is not None and self.nextStep < self.blockListWidget.count():
+            self.blockListWidget.setCurrentRow(self.nextStep)
+
+    def setBuildControlsEnabled(self, enabled):
+        for widget in (self.blockListWidget, self.rewindButton, self.stepBackButton, self.buildNextButton,
+                       self.stepForwardButton, self.fastForwardButton):
+            widget.setEnabled(enabled)
 
     def load(self, blueprintPath):
         self.clear()
-        builder = base.GenericBuilder.loadBlueprint(blueprintPath)
+        builder = base.GenericBuilder.loadBlueprint(blueprintPath, lazy=True)
         self.headerWidget.loadAttrs(builder)
-        for block in builder.blocks:
-            self.insertBlock(block)
-
+        # the list model reads builder.blocks directly, no per-block work here.
         self.builder = builder
+        self.refreshIndicator()
 
     def clear(self):
         self.headerWidget.clear()
@@ -568,13 +575,16 @@ class BlueprintWidget(QtWidgets.QWidget):
     def addBlock(self, block):
         return self.insertBlock(block)
 
-    def runItemCallback(self, item):
-        index = self.blockListWidget.indexFromItem(item).row()
-        self.setBuilderIndex(index)
+    def runItemCallback(self, row):
+        self.setBuilderIndex(row)
         self.buildNext()
 
 
-class BlockListWidget(QtWidgets.QListWidget):
+class BlockListWidget(QtWidgets.QListView):
+    """
+    view of the builder blocks. rows are painted by block_widgets.BlockDelegate from a
+    block_widgets.BlockListModel, so a blueprint with thousands of blocks costs only its visible rows.
+    """
     stylesheet = """
     QListView::item {margin:0px;
     selection-background-color: rgb(60,60,60)};
@@ -583,19 +593,34 @@ class BlockListWidget(QtWidgets.QListWidget):
 
     itemOrderChanged = QtCore.Signal()
     currentIndexSet = QtCore.Signal(int)
+    blockSelectionChanged = QtCore.Signal()
+    blockRenamed = QtCore.Signal(str)
 
     def __init__(self, parent=None, blueprintWidget=None):
         super(BlockListWidget, self).__init__(parent=parent)
         self.blueprintWidget = blueprintWidget
+
+        self.blockModel = block_widgets.BlockListModel(self)
+        self.setModel(self.blockModel)
+        self.blockDelegate = block_widgets.BlockDelegate(self)
+        self.setItemDelegate(self.blockDelegate)
+        self.setEditTriggers(self.DoubleClicked | self.EditKeyPressed)
+
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.setDropIndicatorShown(True)
         self.setDragDropMode(self.InternalMove)
-        # self.setDragDropMode(self.DragDrop)
         self.setSelectionMode(self.ExtendedSelection)
 
         self.setStyleSheet(self.stylesheet)
         self.setAlternatingRowColors(True)
 
-        self.contextMenu = ContextMenu(self)
+        self.blockDelegate.runRequested.connect(self.runBlockCallback)
+        self.blockDelegate.deleteRequested.connect(self.deleteBlock)
+        self.blockModel.blockRenamed.connect(self.blockRenamed)
+        self.selectionModel().selectionChanged.connect(self.blockSelectionChanged)
 
+        self.contextMenu = ContextMenu(self)
         # self.contextMenu.addCommand("edit annotation", self.editAnnotationCallback)
         # self.contextMenu.addSeparator()
 
@@ -610,53 +635,75 @@ class BlockListWidget(QtWidgets.QListWidget):
         icon = IconManager.get("start_from_here.png", type="icon")
         self.contextMenu.addCommand("start from here", self.setNextToSelected, icon=icon)
 
-        self._currItemRow = None
-
     @property
     def builder(self):
         return self.blueprintWidget.builder
 
-    @property
-    def blockWidgets(self):
-        return [self.item(idx).widget for idx in range(self.count())]
+    def setBuilder(self, builder):
+        self.blockModel.setBuilder(builder)
+
+    def count(self):
+        return self.blockModel.rowCount()
+
+    def blockAt(self, row):
+        return self.blockModel.blockAt(row)
+
+    def selectedRows(self):
+        return sorted(index.row() for index in self.selectionModel().selectedRows())
+
+    def selectedBlocks(self):
+        return [self.blockAt(row) for row in self.selectedRows()]
+
+    def selectRows(self, rows):
+        selection = QtCore.QItemSelection()
+        for row in rows:
+            index = self.blockModel.index(row, 0)
+            selection.select(index, index)
+        self.selectionModel().select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
+
+    def setCurrentRow(self, row):
+        index = self.blockModel.index(row, 0)
+        if index.isValid():
+            self.setCurrentIndex(index)
+            self.scrollTo(index)
+
+    def clear(self):
+        self.blockModel.setBuilder(None)
+
+    def refreshIndicator(self, nextStep):
+        self.blockModel.setNextStep(nextStep)
 
     def duplicateSelected(self):
         copyIndex = self.copyBlock()
+        if copyIndex is None:
+            return
         inserted_indices = self.pasteBlock(index=copyIndex+1)
-
-        self.clearSelection()
-        for idx in inserted_indices:
-            self.item(idx).setSelected(True)
+        self.selectRows(inserted_indices)
 
     def copyBlock(self):
-        items = self.selectedItems()
-        blocks = []
-        last_index = 0
-        for item in items:
-            index = self.indexFromItem(item).row()
-            block = item.block
-            blocks.append(block)
-            if index > last_index:
-                last_index = index
+        rows = self.selectedRows()
+        if not rows:
+            return
 
-        settings.dumpBlocks(blocks)
-        return last_index
+        settings.dumpBlocks([self.blockAt(row) for row in rows])
+        return rows[-1]
 
     def pasteBlock(self, index=None):
         blockDataList = settings.loadBlocks()
 
         inserted_indices  = []
 
+        if index is None:
+            index = self.count()
+
         for data in blockDataList:
             block = Block.load(data)
             newName = self.builder.getNextUniqueName(prefix="Copy of "+data.get("name"))
             block.new_uuid()
             block.name=newName
-            if index is not None:
-                item = self.insertBlock(block, index=index)
-                # self.scrollToItem(item, QtWidgets.QAbstractItemView.PositionAtTop)
-                inserted_indices.append(index)
-                index+=1
+            self.insertBlock(block, index=index)
+            inserted_indices.append(index)
+            index+=1
 
         return inserted_indices
 
@@ -664,124 +711,78 @@ class BlockListWidget(QtWidgets.QListWidget):
         self.setDragDropMode(self.InternalMove)
         super(BlockListWidget, self).mousePressEvent(event)
 
-        btn = event.button()
-        if btn == QtCore.Qt.MiddleButton or btn == QtCore.Qt.LeftButton:
-            self._currItemRow = self.currentRow()
-
-    def mouseMoveEvent(self, event):
-        super(BlockListWidget, self).mouseMoveEvent(event)
-
-        newRow = self.currentRow()
-        if newRow != self._currItemRow:
-            self._currItemRow = newRow
-
-    def rowsInserted(self, *args, **kwargs):
-        super(BlockListWidget, self).rowsInserted(*args, **kwargs)
-        # self.scrollToBottom()
-
     def setNextToSelected(self):
-        index = self.currentIndex()
-        self.currentIndexSet.emit(index)
+        index = self.currentRow()
+        if index is not None:
+            self.currentIndexSet.emit(index)
 
     def editAnnotationCallback(self):
         pass
 
-    def currentIndex(self):
-        indices = self.selectedIndexes()
-        if indices:
-            return indices[0].row()
+    def currentRow(self):
+        rows = self.selectedRows()
+        if rows:
+            return rows[0]
 
-    def dropEvent(self, event):
+    def _dropRow(self, event):
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            return self.count()
+        if self.dropIndicatorPosition() == self.BelowItem:
+            return index.row() + 1
+        return index.row()
 
+    def dropEvent(self, event):
         data = event.mimeData()
-
         source = event.source()
-        if isinstance(source, BlockListWidget):
-            # self.setDragDropMode(self.InternalMove)
-            ret = super(BlockListWidget, self).dropEvent(event)
-            self.itemOrderChanged.emit()
-            return ret
+        row = self._dropRow(event)
+
+        if source is self:
+            rows = self.selectedRows()
+            if rows:
+                newRows = self.blockModel.moveBlocks(rows, row)
+                self.selectRows(newRows)
+                self.itemOrderChanged.emit()
+            # the blocks were moved here already, keep the view from removing the dragged rows.
+            event.setDropAction(QtCore.Qt.IgnoreAction)
+            event.accept()
 
         elif isinstance(source, BlockMenuListWidget):
-            # DIRTY TRICK TO GET WHERE THE NEW ITEM SHOULD BE INSERTED
-            # use default behaviour of dropevent to put the item
-            super(BlockListWidget, self).dropEvent(event)
-            idx = 0
-            insertIndex = -1
-            while idx < self.count():
-                item = self.item(idx)
-                if not hasattr(item, "widget"):
-                    insertIndex = idx
-                    self.takeItem(idx)
-                    break
-
-                idx += 1
-            #########################################
-
             blockTypes = [each.path() for each in data.urls()]
             for blockType in blockTypes:
                 block = self.blueprintWidget.builder.createBlock(blockType)
-                self.insertBlock(block, index=insertIndex)
+                self.insertBlock(block, index=row)
+                row += 1
+            event.setDropAction(QtCore.Qt.CopyAction)
+            event.accept()
 
-    def allItems(self):
-        return [self.item(idx) for idx in range(self.count())]
+        else:
+            super(BlockListWidget, self).dropEvent(event)
 
     def addBlock(self, block):
         index = self.count()
         self.insertBlock(block, index)
 
     def insertBlock(self, block, index=-1):
-        if index < 0:
-            index = self.count()
-
-        item = BlockItem()
-        if block.__class__.__name__ == 'BreakPoint':
-            item.setSizeHint(QtCore.QSize(50, 40))
-            opWidget = block_widgets.BreakPointWidget(block, item)
-        else:
-            item.setSizeHint(QtCore.QSize(50, 80))
-            opWidget = block_widgets.BlockWidget(block, item)
-            opWidget.runBlockSignal.connect(self.runBlockCallback)
-        opWidget.itemDeleted.connect(self.deleteBlock)
-        item.widget, opWidget.item = opWidget, item
+        if self.blockModel.builder is not self.builder:
+            self.blockModel.setBuilder(self.builder)
 
-
-        mainWindow = getMainWindow(self)
-        opWidget.nameEdited.connect(mainWindow.editorDock.setWindowTitle)
-
-        self.insertItem(index, item)
-        self.builder.insertBlock(block, index=index)
-        self.setItemWidget(item, opWidget)
-        self.clearSelection()
-        item.setSelected(True)
+        row = self.blockModel.insertBlock(block, index)
+        self.selectRows([row])
         self.itemOrderChanged.emit()
 
-        return item
+        return row
 
-    def runBlockCallback(self, blockWidget):
-        item = blockWidget.item
-        index = self.indexFromItem(item).row()
-        self.blueprintWidget.setBuilderIndex(index)
+    def runBlockCallback(self, row):
+        self.blueprintWidget.setBuilderIndex(row)
         self.blueprintWidget.buildNext()
 
-    def deleteBlock(self, block):
-        self.builder.blocks.remove(block)
+    def deleteBlock(self, row):
+        self.blockModel.removeBlock(row)
         self.blueprintWidget.syncBuilder()
         log.debug("deleted: {0}".format(self.builder.blocks))
 
 
-
-class BlockItem(QtWidgets.QListWidgetItem):
-    def __init__(self, *args, **kwargs):
-        super(BlockItem, self).__init__(*args, **kwargs)
-        self.widget = None
-
-    @property
-    def block(self):
-        return self.widget.block
-
-
-
 class HeaderWidget(QtWidgets.QGroupBox):
     def __init__(self, parent=None):
         super(HeaderWidget, self).__init__(parent=parent)
@@ -1117,18 +1118,14 @@ class RenameAttrDialog(QtWidgets.QDialog):
 
 
 class Block_Editor_Widget(QtWidgets.QWidget):
-    def __init__(self, blockWidget=None, **kwargs):
+    def __init__(self, block=None, **kwargs):
         super(Block_Editor_Widget, self).__init__(**kwargs)
-        self.blockWidget = blockWidget
+        self.block = block
         layout = VBoxLayout(self)
 
-    @property
-    def block(self):
-        return self.blockWidget.block
-
     def syncData(self):
         data = self.getData()
-        if self.blockWidget:
+        if self.block is not None:
             self.block.reload(data)
 
 
@@ -1141,23 +1138,22 @@ class Block_Editor_Widget(QtWidgets.QWidget):
                 widget.setParent(None)
                 # looks like it needs this to properly delete the widget?
                 widget.deleteLater()
-        self.blockWidget = None
+        self.block = None
         mainWindow = getMainWindow(self)
         mainWindow.editorDock.setWindowTitle("")
 
-    def update(self, blockWidget, force=False):
+    def update(self, block, force=False):
         mainWindow = getMainWindow(self)
 
-        if blockWidget == self.blockWidget and not force:
-            # already on the same block widget, doesn't need to update.
+        if block is self.block and not force:
+            # already on the same block, doesn't need to update.
             return
 
         self.clear()
 
-        mainWindow.editorDock.setWindowTitle(blockWidget.currentName())
+        mainWindow.editorDock.setWindowTitle(block.name)
 
-        self.blockWidget = blockWidget
-        self.blockWidget.editorWidget = self
+        self.block = block
         self.attrTree = AttrTree(self)
         self.attrTree.attrEdited.connect(self.syncData)
         self.layout().addWidget(self.attrTree)
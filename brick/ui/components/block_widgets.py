@@ -1,214 +1,312 @@
 from collections import OrderedDict
 from qqt import QtCore, QtGui, QtWidgets
-from qqt.gui import qcreate, HBoxLayout, VBoxLayout, Button, StringField, Spacer, Checkbox, SeparatorLine, Image
+from brick.constants import BuildStatus
 from brick.ui import IconManager
 
-class BaseBlockWidget(QtWidgets.QWidget):
-    itemDeleted = QtCore.Signal(object)
-    activeStateEdited = QtCore.Signal(bool)
-    nameEdited = QtCore.Signal(str)
-    runBlockSignal = QtCore.Signal(object)
-
-    def __init__(self, block, item, parent=None):
-        super(BaseBlockWidget, self).__init__(parent=parent)
-        self.editorWidget = None
-        self.deleteButton = None
-        self.activeCheckBox = None
-        self.blockNameField = None
-        self.block = block
-        self.item = item
-        self._headerStyleSheet = None
-
-
-
-    def _connectSignals(self):
-        self.deleteButton.clicked.connect(self.delete)
-        self.activeCheckBox.clicked.connect(self.switchActiveState)
-        self.blockNameField.editingFinished.connect(self.blockNameFieldEdited)
-        self.blockNameField.returnPressed.connect(self.blockNameFieldEdited)
-
-
-
-    def delete(self):
-        self.itemDeleted.emit(self.block)
-        item = self.item
-        lw = item.listWidget()
-        idx = lw.indexFromItem(item).row()
-        lw.takeItem(idx)
-
-    def switchActiveState(self):
-        currState = self.activeCheckBox.isChecked()
-        self.setEnableDisplay(currState)
-
-        self.syncData()
-        self.activeStateEdited.emit(currState)
-
-    def blockNameFieldEdited(self):
-        self.blockNameField.clearFocus()
-        val = self.blockNameField.getValue()
-        self.syncData()
-        self.nameEdited.emit(val)
-
-    def switchIndicator(self, state):
-        return
-
-    def syncData(self):
-        return
-
-    def currentName(self):
-        return self.blockNameField.getValue()
-
-class BlockWidget(BaseBlockWidget):
-
-    def __init__(self, *args, **kwargs):
-        super(BlockWidget, self).__init__(*args,**kwargs)
-        self._initUI()
-        self._connectSignals()
-
-    def _initUI(self):
-        layout = VBoxLayout(self)
-        layout.setContentsMargins(2,0,2,0)
-        with layout:
-            mainLayout = qcreate(HBoxLayout)
-            mainLayout.setContentsMargins(0,0,0,0)
-            with mainLayout:
-                self.indicatorWidget = qcreate(QtWidgets.QStackedWidget)
-                self.indicatorWidget.setFixedWidth(15)
-                self.nothing = qcreate(QtWidgets.QLabel)
-                self.nothing.setStyleSheet('background-color:rgb(126, 126, 126)')
-                self.success = qcreate(QtWidgets.QLabel)
-                self.success.setStyleSheet('background-color:rgb(52, 141, 3)')
-                self.fail = qcreate(QtWidgets.QLabel)
-                self.fail.setStyleSheet('background-color:rgb(149, 0, 2)')
-                self.next = qcreate(QtWidgets.QLabel)
-                self.next.setStyleSheet('background-color:rgb(244, 244, 0)')
-
-                self.indicatorWidget.addWidget(self.nothing)
-                self.indicatorWidget.addWidget(self.success)
-                self.indicatorWidget.addWidget(self.fail)
-                self.indicatorWidget.addWidget(self.next)
-
-                # self.indicatorWidget.setCurrentIndex(1)
-
-                self.frame = qcreate(QtWidgets.QFrame,layoutType=HBoxLayout)
-                self.frame.layout().setContentsMargins(0, 0, 0, 0)
-                with self.frame.layout():
-
-                    self.activeCheckBox = qcreate(Checkbox)
-                    icon = IconManager.get(self.block.ui_icon_name, type="path")
-
-                    self.labelIcon = qcreate(Image,icon, w=15,h=15)
-
-                    self.blockTypeLabel = qcreate(QtWidgets.QLabel,"Block Type")
-                    self.blockNameField = qcreate(StringField)
-
-
-                    qcreate(Spacer)
-
-
-                with qcreate(VBoxLayout):
-                    with qcreate(HBoxLayout):
-                        icon = IconManager.get("play.svg", type="icon")
-                        self.runBlockButton = qcreate(Button, icon, "")
-
-                        qcreate(QtWidgets.QLabel,"  ")
-
-                        icon = IconManager.get("delete.svg", type="icon")
-                        self.deleteButton = qcreate(Button, "",icon=icon)
-                        self.deleteButton.setFixedSize(QtCore.QSize(15,15))
-
-
-                    # self.runBlockButton = qcreate(Button,">")
-                    # self.runBlockButton.setFixedWidth(20)
-                    # self.runBlockButton.setFixedHeight(60)
-
-            qcreate(SeparatorLine)
-
-
-        self.blockTypeLabel.setText("{} : ".format(self.block.__class__.__name__))
-        self.blockTypeLabel.setText("{} : ".format(self.block.__class__.__name__))
-        self.blockNameField.setValue(self.block.name)
-        self.activeCheckBox.setValue(self.block.active)
-        self.setEnableDisplay(self.block.active)
-
-
-    def _connectSignals(self):
-        super(BlockWidget, self)._connectSignals()
-        self.runBlockButton.clicked.connect(self.runBlockCalled)
-
-    def setEnableDisplay(self, enabled):
-        if enabled:
-            self.setStyleSheet('')
+# custom item data roles of BlockListModel.
+BlockRole = QtCore.Qt.UserRole + 1
+StatusRole = QtCore.Qt.UserRole + 2
+
+ROW_HEIGHT = 80
+BREAKPOINT_ROW_HEIGHT = 40
+
+_statusColors = {
+    BuildStatus.nothing: QtGui.QColor(126, 126, 126),
+    BuildStatus.success: QtGui.QColor(52, 141, 3),
+    BuildStatus.fail: QtGui.QColor(149, 0, 2),
+    BuildStatus.next: QtGui.QColor(244, 244, 0),
+}
+
+_inactiveColor = QtGui.QColor(128, 128, 128)
+_breakPointColor = QtGui.QColor(129, 65, 0)
+
+
+def _textWidth(fontMetrics, text):
+    # QFontMetrics.width is gone in Qt6, horizontalAdvance is missing before Qt 5.11.
+    if hasattr(fontMetrics, 'horizontalAdvance'):
+        return fontMetrics.horizontalAdvance(text)
+    return fontMetrics.width(text)
+
+
+def isBreakPoint(block):
+    return block.__class__.__name__ == 'BreakPoint'
+
+
+class BlockListModel(QtCore.QAbstractListModel):
+    """
+    list model over the blocks of a builder. rows are the builder blocks themselves, nothing is copied,
+    so the view only touches the blocks of the rows it paints.
+    """
+    blockRenamed = QtCore.Signal(str)
+
+    def __init__(self, parent=None):
+        super(BlockListModel, self).__init__(parent)
+        self._builder = None
+        self._nextStep = None
+
+    @property
+    def builder(self):
+        return self._builder
+
+    def setBuilder(self, builder):
+        self.beginResetModel()
+        self._builder = builder
+        self._nextStep = None
+        self.endResetModel()
+
+    @property
+    def blocks(self):
+        return self._builder.blocks if self._builder is not None else []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.blocks)
+
+    def blockAt(self, row):
+        blocks = self.blocks
+        if 0 <= row < len(blocks):
+            return blocks[row]
+
+    def status(self, row, block):
+        if row == self._nextStep and block.buildStatus != BuildStatus.fail:
+            return BuildStatus.next
+        return block.buildStatus
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        block = self.blockAt(index.row())
+        if block is None:
+            return None
+
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return block.name
+        if role == QtCore.Qt.CheckStateRole:
+            return QtCore.Qt.Checked if block.active else QtCore.Qt.Unchecked
+        if role == QtCore.Qt.ToolTipRole:
+            return block.notes or None
+        if role == BlockRole:
+            return block
+        if role == StatusRole:
+            return self.status(index.row(), block)
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        block = self.blockAt(index.row())
+        if block is None:
+            return False
+
+        if role == QtCore.Qt.EditRole:
+            if not value or value == block.name:
+                return False
+            block.reload(OrderedDict([('name', value)]))
+            self.dataChanged.emit(index, index)
+            self.blockRenamed.emit(value)
+            return True
+
+        if role == QtCore.Qt.CheckStateRole:
+            block.reload(OrderedDict([('active', value in (QtCore.Qt.Checked, True))]))
+            self.dataChanged.emit(index, index)
+            return True
+
+        return False
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.ItemIsDropEnabled
+
+        flags = (QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsDragEnabled |
+                 QtCore.Qt.ItemIsUserCheckable)
+        if not isBreakPoint(self.blockAt(index.row())):
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def supportedDropActions(self):
+        return QtCore.Qt.MoveAction | QtCore.Qt.CopyAction
+
+    def insertBlock(self, block, row=-1):
+        if row < 0 or row > self.rowCount():
+            row = self.rowCount()
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._builder.insertBlock(block, index=row)
+        self.endInsertRows()
+        return row
+
+    def removeBlock(self, row):
+        block = self.blockAt(row)
+        if block is None:
+            return None
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        self.blocks.remove(block)
+        self.endRemoveRows()
+        return block
+
+    def moveBlocks(self, rows, targetRow):
+        """
+        move the blocks at rows, keeping their order, in front of the block at targetRow.
+        return the new rows of the moved blocks.
+        """
+        blocks = self.blocks
+        rows = sorted(set(rows))
+        moving = [blocks[row] for row in rows]
+        targetRow -= len([row for row in rows if row < targetRow])
+
+        self.layoutAboutToBeChanged.emit()
+        oldIndexes = self.persistentIndexList()
+        oldBlocks = [self.blockAt(index.row()) for index in oldIndexes]
+
+        for block in moving:
+            blocks.remove(block)
+        for offset, block in enumerate(moving):
+            blocks.insert(targetRow + offset, block)
+
+        newIndexes = [self.index(blocks.index(block), 0) if block is not None else QtCore.QModelIndex()
+                      for block in oldBlocks]
+        self.changePersistentIndexList(oldIndexes, newIndexes)
+        self.layoutChanged.emit()
+
+        return list(range(targetRow, targetRow + len(moving)))
+
+    def setNextStep(self, nextStep):
+        self._nextStep = nextStep
+        self.refreshStatus()
+
+    def refreshStatus(self):
+        """
+        repaint the status indicators, only the visible rows are actually redrawn.
+        """
+        count = self.rowCount()
+        if count:
+            self.dataChanged.emit(self.index(0, 0), self.index(count - 1, 0))
+
+
+class BlockDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    paints block rows instead of creating a widget per block. only the name editor is a real widget, and only
+    while a row is being edited.
+    """
+    runRequested = QtCore.Signal(int)
+    deleteRequested = QtCore.Signal(int)
+
+    margin = 4
+    indicatorWidth = 15
+    iconSize = 15
+    buttonSize = 15
+
+    def __init__(self, parent=None):
+        super(BlockDelegate, self).__init__(parent)
+        self._icons = {}
+
+    def icon(self, name):
+        icon = self._icons.get(name)
+        if icon is None:
+            icon = self._icons[name] = IconManager.get(name, type="icon")
+        return icon
+
+    def sizeHint(self, option, index):
+        block = index.data(BlockRole)
+        height = BREAKPOINT_ROW_HEIGHT if block is not None and isBreakPoint(block) else ROW_HEIGHT
+        return QtCore.QSize(50, height)
+
+    def _rects(self, option, block):
+        rect = option.rect.adjusted(2, 0, -2, -1)
+        centerY = rect.center().y()
+        rects = {}
+        rects['indicator'] = QtCore.QRect(rect.left(), rect.top(), self.indicatorWidth, rect.height())
+
+        left = rects['indicator'].right() + self.margin
+        rects['check'] = QtCore.QRect(left, centerY - 7, 14, 14)
+        left = rects['check'].right() + self.margin
+        rects['icon'] = QtCore.QRect(left, centerY - self.iconSize // 2, self.iconSize, self.iconSize)
+        left = rects['icon'].right() + self.margin
+
+        right = rect.right() - self.margin
+        rects['delete'] = QtCore.QRect(right - self.buttonSize, rect.top() + self.margin,
+                                       self.buttonSize, self.buttonSize)
+        if not isBreakPoint(block):
+            rects['run'] = QtCore.QRect(rects['delete'].left() - 2 * self.margin - 24, centerY - 12, 24, 24)
+            right = rects['run'].left() - self.margin
         else:
-            self.setStyleSheet("""QWidget {background-color:gray;}""")
-
-
-    def runBlockCalled(self):
-        self.runBlockSignal.emit(self)
-
-    def syncData(self):
-        data = OrderedDict()
-        data['name'] = self.blockNameField.text()
-        data['active'] = self.activeCheckBox.isChecked()
-
-        self.block.reload(data)
-
-    def switchIndicator(self, state):
-        self.indicatorWidget.setCurrentIndex(state)
-
-
-
-
-class BreakPointWidget(BaseBlockWidget):
-    def __init__(self, *args, **kwargs):
-        super(BreakPointWidget, self).__init__(*args,**kwargs)
-        self._initUI()
-        self._connectSignals()
-
-    def _initUI(self):
-        layout = VBoxLayout(self)
-        layout.setContentsMargins(2,0,2,0)
-        with layout:
-            mainLayout = qcreate(HBoxLayout)
-            mainLayout.setContentsMargins(0,0,0,0)
-            with mainLayout:
-                self.indicatorWidget = qcreate(QtWidgets.QStackedWidget)
-                self.indicatorWidget.setFixedWidth(15)
-                self.nothing = qcreate(QtWidgets.QLabel)
-                self.indicatorWidget.addWidget(self.nothing)
-
-                self.frame = qcreate(QtWidgets.QFrame,layoutType=HBoxLayout)
-                self.frame.layout().setContentsMargins(0, 0, 0, 0)
-                with self.frame.layout():
-                    self.activeCheckBox = qcreate(Checkbox)
-                    self.blockType = qcreate(QtWidgets.QLabel,"Break Point")
-                    self.blockNameField = qcreate(StringField)
-                    self.blockNameField.setHidden(True)
-                    qcreate(Spacer)
-
-                with qcreate(VBoxLayout):
-                    icon = IconManager.get("delete.svg", type="icon")
-                    self.deleteButton = qcreate(Button, "", icon=icon)
-                    self.deleteButton.setFixedSize(QtCore.QSize(15, 15))
-
-
-            qcreate(SeparatorLine)
-
-
-        # self.setEnableDisplay(True)
-
-        self.activeCheckBox.setValue(self.block.active)
-        self.setEnableDisplay(self.block.active)
-
-
-    def setEnableDisplay(self, enabled):
-        if enabled:
-            self.setStyleSheet('background-color:rgb(129, 65, 0)')
-        else:
-            self.setStyleSheet("""QWidget {background-color:gray;}""")
-
-
-    def syncData(self):
-        data = OrderedDict()
-        data['active'] = self.activeCheckBox.isChecked()
-        self.block.reload(data)
+            right = rects['delete'].left() - self.margin
+
+        label = 'Break Point' if isBreakPoint(block) else '{} : '.format(block.__class__.__name__)
+        rects['label'] = QtCore.QRect(left, rect.top(), _textWidth(option.fontMetrics, label), rect.height())
+        rects['name'] = QtCore.QRect(rects['label'].right() + self.margin, centerY - 11,
+                                     max(right - rects['label'].right() - self.margin, 0), 22)
+        return rect, label, rects
+
+    def paint(self, painter, option, index):
+        block = index.data(BlockRole)
+        if block is None:
+            return super(BlockDelegate, self).paint(painter, option, index)
+
+        rect, label, rects = self._rects(option, block)
+        painter.save()
+
+        if not block.active:
+            painter.fillRect(rect, _inactiveColor)
+        elif isBreakPoint(block):
+            painter.fillRect(rect, _breakPointColor)
+        elif option.state & QtWidgets.QStyle.State_Selected:
+            painter.fillRect(rect, option.palette.highlight())
+
+        if not isBreakPoint(block):
+            painter.fillRect(rects['indicator'], _statusColors.get(index.data(StatusRole),
+                                                                   _statusColors[BuildStatus.nothing]))
+
+        checkOption = QtWidgets.QStyleOptionButton()
+        checkOption.rect = rects['check']
+        checkOption.state = QtWidgets.QStyle.State_Enabled | (
+            QtWidgets.QStyle.State_On if block.active else QtWidgets.QStyle.State_Off)
+        style = option.widget.style() if option.widget else QtWidgets.QApplication.style()
+        style.drawControl(QtWidgets.QStyle.CE_CheckBox, checkOption, painter)
+
+        if not isBreakPoint(block):
+            self.icon(block.ui_icon_name).paint(painter, rects['icon'])
+            self.icon("play.svg").paint(painter, rects['run'])
+        self.icon("delete.svg").paint(painter, rects['delete'])
+
+        painter.setPen(option.palette.color(QtGui.QPalette.Text))
+        painter.drawText(rects['label'], QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft, label)
+        if not isBreakPoint(block):
+            painter.drawText(rects['name'], QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft, block.name)
+
+        painter.setPen(option.palette.color(QtGui.QPalette.Mid))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QtCore.QEvent.MouseButtonRelease or event.button() != QtCore.Qt.LeftButton:
+            return super(BlockDelegate, self).editorEvent(event, model, option, index)
+
+        block = index.data(BlockRole)
+        if block is None:
+            return False
+
+        rect, label, rects = self._rects(option, block)
+        pos = event.pos()
+        if rects['check'].contains(pos):
+            model.setData(index, QtCore.Qt.Unchecked if block.active else QtCore.Qt.Checked,
+                          QtCore.Qt.CheckStateRole)
+            return True
+        if 'run' in rects and rects['run'].contains(pos):
+            self.runRequested.emit(index.row())
+            return True
+        if rects['delete'].contains(pos):
+            self.deleteRequested.emit(index.row())
+            return True
+
+        return super(BlockDelegate, self).editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        return QtWidgets.QLineEdit(parent)
+
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(QtCore.Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), QtCore.Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        block = index.data(BlockRole)
+        editor.setGeometry(self._rects(option, block)[2]['name'])
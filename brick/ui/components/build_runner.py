@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import time
+from qqt import QtCore
+
+from brick.constants import BuildStatus
+from brick.base import log
+
+
+class BuildRunner(QtCore.QThread):
+    """
+    runs the remaining blocks of a builder off the gui thread.
+
+    progress is reported through signals, at most once per updateInterval seconds, plus once at the end.
+    requestInterruption() stops the build before the next block starts, a running block always finishes.
+    """
+    progressed = QtCore.Signal(int, int)
+    buildFinished = QtCore.Signal(int)
+
+    updateInterval = 0.05
+
+    def __init__(self, builder, parent=None):
+        super(BuildRunner, self).__init__(parent)
+        self.builder = builder
+        self.status = BuildStatus.nothing
+
+    @property
+    def total(self):
+        return len(self.builder.blocks)
+
+    def run(self):
+        lastUpdate = 0.0
+        status = BuildStatus.nothing
+        try:
+            # same as Builder.fastForward, load the nested blueprints up front and in parallel.
+            self.builder.prefetchBlueprints()
+
+            while not self.isInterruptionRequested():
+                status = self.builder.buildNext()
+
+                now = time.time()
+                if now - lastUpdate >= self.updateInterval:
+                    lastUpdate = now
+                    self.progressed.emit(self.builder.nextStep, self.total)
+
+                if status in (BuildStatus.fail, BuildStatus.end):
+                    break
+            else:
+                log.info("{0}: build cancelled at step {1}".format(self.builder.name, self.builder.nextStep))
+        except Exception:
+            log.exception("build runner stopped")
+            status = BuildStatus.fail
+        finally:
+            self.status = status
+            self.progressed.emit(self.builder.nextStep, self.total)
+            self.buildFinished.emit(status)
+
+
+class QtTimerScheduler(object):
+    """
+    plain Qt host hook, runs each callback from a zero timer once the event loop has processed pending events.
+    """
+    requiresMainThread = False
+
+    def schedule(self, callback):
+        QtCore.QTimer.singleShot(0, callback)
+
+
+class CooperativeBuildRunner(QtCore.QObject):
+    """
+    runs the remaining blocks of a builder on the gui thread, one block per event loop tick.
+
+    for hosts whose scene can only be touched from the main thread. between two blocks control goes back to the
+    event loop through the host scheduler, so repaints, abort and log updates are processed. offers the same
+    signals and methods as BuildRunner.
+    """
+    progressed = QtCore.Signal(int, int)
+    buildFinished = QtCore.Signal(int)
+
+    updateInterval = 0.05
+
+    def __init__(self, builder, scheduler=None, parent=None):
+        super(CooperativeBuildRunner, self).__init__(parent)
+        self.builder = builder
+        self.scheduler = scheduler or QtTimerScheduler()
+        self.status = BuildStatus.nothing
+        self._running = False
+        self._interrupted = False
+        self._prefetched = False
+        self._lastUpdate = 0.0
+
+    @property
+    def total(self):
+        return len(self.builder.blocks)
+
+    def start(self):
+        self._running = True
+        self._interrupted = False
+        self._prefetched = False
+        self._lastUpdate = 0.0
+        self.scheduler.schedule(self._step)
+
+    def isRunning(self):
+        return self._running
+
+    def requestInterruption(self):
+        self._interrupted = True
+
+    def isInterruptionRequested(self):
+        return self._interrupted
+
+    def wait(self, *args):
+        # every step runs on this thread, there is nothing to join.
+        return True
+
+    def _step(self):
+        if not self._running:
+            return
+
+        if self._interrupted:
+            log.info("{0}: build cancelled at step {1}".format(self.builder.name, self.builder.nextStep))
+            return self._finish(self.status)
+
+        try:
+            if not self._prefetched:
+                # first tick, load the nested blueprints up front like Builder.fastForward does.
+                self._prefetched = True
+                self.builder.prefetchBlueprints()
+            status = self.builder.buildNext()
+        except Exception:
+            log.exception("build runner stopped")
+            status = BuildStatus.fail
+
+        self.status = status
+        if status in (BuildStatus.fail, BuildStatus.end):
+            return self._finish(status)
+
+        now = time.time()
+        if now - self._lastUpdate >= self.updateInterval:
+            self._lastUpdate = now
+            self.progressed.emit(self.builder.nextStep, self.total)
+
+        self.scheduler.schedule(self._step)
+
+    def _finish(self, status):
+        self._running = False
+        self.progressed.emit(self.builder.nextStep, self.total)
+        self.buildFinished.emit(status)
+
+
+_hostScheduler = None
+
+
+def setHostScheduler(scheduler):
+    """
+    set the host hook deciding how builds are run, see getHostScheduler.
+    """
+    global _hostScheduler
+    _hostScheduler = scheduler
+
+
+def getHostScheduler():
+    """
+    return the host hook. it has a schedule(callback) method, and requiresMainThread tells whether builds
+    have to step on the gui thread instead of running on a worker thread.
+    """
+    global _hostScheduler
+    if _hostScheduler is None:
+        if re.match("maya", os.path.basename(sys.executable), re.I):
+            from brick.hosts.maya_utils import MayaScheduler
+            _hostScheduler = MayaScheduler()
+        else:
+            _hostScheduler = QtTimerScheduler()
+    return _hostScheduler
+
+
+def createBuildRunner(builder, parent=None):
+    scheduler = getHostScheduler()
+    if scheduler.requiresMainThread:
+        return CooperativeBuildRunner(builder, scheduler=scheduler, parent=parent)
+    return BuildRunner(builder, parent=parent)
@@ -1,42 +1,132 @@
 import sys
+import tempfile
+import threading
+from collections import deque
 from qqt import QtWidgets, QtCore, QtGui
 
-class EmittingStream(QtCore.QObject):
-    textWritten = QtCore.Signal(str)
+# lines kept in the widget, older lines are only in the spill file.
+MAX_LINES = 5000
+
+# text waiting for the next flush is capped as well, for writes while the event loop is busy.
+MAX_PENDING_CHARS = 512 * 1024
+
+FLUSH_INTERVAL = 100
+
+
+class BufferedStream(object):
+    """
+    stdout replacement that collects writes from any thread and appends everything to a spill file.
+    the widget takes the collected text on a timer instead of on every write.
+    """
+    def __init__(self, spillPath=None):
+        if spillPath is None:
+            spillFile = tempfile.NamedTemporaryFile(mode='w', prefix='brick_log_', suffix='.log', delete=False)
+        else:
+            spillFile = open(spillPath, 'w')
+        self.spillPath = spillFile.name
+        self._spillFile = spillFile
+        self._pending = deque()
+        self._pendingChars = 0
+        self._lock = threading.Lock()
 
     def write(self, text):
-        self.textWritten.emit(text)
+        if not text:
+            return
+        with self._lock:
+            if self._spillFile is not None:
+                self._spillFile.write(text)
+            self._pending.append(text)
+            self._pendingChars += len(text)
+            while self._pendingChars > MAX_PENDING_CHARS and len(self._pending) > 1:
+                self._pendingChars -= len(self._pending.popleft())
+
+    def flush(self):
+        with self._lock:
+            if self._spillFile is not None:
+                self._spillFile.flush()
+
+    def takePending(self):
+        """
+        return the text written since the last call, and flush the spill file.
+        """
+        with self._lock:
+            if not self._pending:
+                return ''
+            text = ''.join(self._pending)
+            self._pending.clear()
+            self._pendingChars = 0
+            if self._spillFile is not None:
+                self._spillFile.flush()
+        return text
+
+    def close(self):
+        with self._lock:
+            if self._spillFile is not None:
+                self._spillFile.close()
+                self._spillFile = None
+
 
 class Log_Widget(QtWidgets.QWidget):
     def __init__(self, parent=None):
         super(Log_Widget, self).__init__(parent=parent)
 
         # Install the custom output stream
-        sys.stdout = EmittingStream()
-        sys.stdout.textWritten.connect(self.normalOutputWritten)
-
-        # self.rout = sys.stdout
+        self.stream = BufferedStream()
+        sys.stdout = self.stream
 
         self.initUI()
 
+        self.flushTimer = QtCore.QTimer(self)
+        self.flushTimer.setInterval(FLUSH_INTERVAL)
+        self.flushTimer.timeout.connect(self.flushOutput)
+        self.flushTimer.start()
+
     def initUI(self):
         layout = QtWidgets.QVBoxLayout()
         self.setLayout(layout)
 
-        self.textEdit = QtWidgets.QTextEdit()
+        self.textEdit = QtWidgets.QPlainTextEdit()
+        self.textEdit.setReadOnly(True)
+        self.textEdit.setMaximumBlockCount(MAX_LINES)
         self.textEdit.setMinimumHeight(120)
         layout.addWidget(self.textEdit)
 
+        buttonLayout = QtWidgets.QHBoxLayout()
+        buttonLayout.addStretch()
+        self.openFullLogButton = QtWidgets.QPushButton('Open Full Log')
+        self.openFullLogButton.setToolTip('open the complete output, including lines dropped from this view')
+        self.openFullLogButton.clicked.connect(self.openFullLog)
+        buttonLayout.addWidget(self.openFullLogButton)
+        layout.addLayout(buttonLayout)
 
     def __del__(self):
         # Restore sys.stdout
         sys.stdout = sys.__stdout__
+        self.stream.close()
 
-    def normalOutputWritten(self, text):
-        """Append text to the QTextEdit."""
-        # Maybe QTextEdit.append() works as well, but this is how I do it:
-        cursor = self.textEdit.textCursor()
+    def flushOutput(self):
+        """
+        append the text written since the last flush, in one edit.
+        """
+        text = self.stream.takePending()
+        if not text:
+            return
+
+        scrollBar = self.textEdit.verticalScrollBar()
+        atBottom = scrollBar.value() == scrollBar.maximum()
+
+        cursor = QtGui.QTextCursor(self.textEdit.document())
         cursor.movePosition(QtGui.QTextCursor.End)
         cursor.insertText(text)
-        self.textEdit.setTextCursor(cursor)
-        self.textEdit.ensureCursorVisible()
\ No newline at end of file
+
+        # only follow the output when the user has not scrolled up to read.
+        if atBottom:
+            scrollBar.setValue(scrollBar.maximum())
+
+    def normalOutputWritten(self, text):
+        """Append text to the log."""
+        self.stream.write(text)
+
+    def openFullLog(self):
+        self.stream.flush()
+        QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(self.stream.spillPath))
@@ -1,4 +1,5 @@
 import os
+import time
 from qqt import QtWidgets, QtGui, QtCore
 from Qt.QtCompat import loadUi
 from brick.lib.path import Path
@@ -6,6 +7,7 @@ from brick.base import log, unicode
 
 from brick.constants import BLUEPRINT_EXTENSION
 from brick import lib
+from brick.lib.catalog import Catalog
 
 UIDIR = os.path.dirname(__file__)
 
@@ -71,6 +73,7 @@ class BlueprintTreeWidget(QtWidgets.QTreeWidget):
         tempatePath = item.filePath
         if tempatePath.exists():
             tempatePath.remove()
+        Catalog(tempatePath.parent).remove(tempatePath)
 
         idx = self.indexOfTopLevelItem(item)
         self.takeTopLevelItem(idx)
@@ -88,10 +91,12 @@ class BlueprintTreeWidget(QtWidgets.QTreeWidget):
 class BlueprintTreeItem(QtWidgets.QTreeWidgetItem):
     """
     item to display blueprint and its information.
+    the information comes from a catalog entry when given, otherwise from the blueprint file itself.
     """
-    def __init__(self, filePath, parent=None):
+    def __init__(self, filePath, parent=None, entry=None):
         super(BlueprintTreeItem, self).__init__(parent=parent)
         self._filePath = filePath
+        self._entry = entry
         self._name = None
         self._notes = None
         self.deleteButton = None
@@ -111,7 +116,7 @@ class BlueprintTreeItem(QtWidgets.QTreeWidgetItem):
         return self._filePath
 
     def loadData(self):
-        blueprintData = lib.loadData(self._filePath) or {}
+        blueprintData = self._entry if self._entry is not None else lib.loadData(self._filePath) or {}
 
         self._name = self._filePath.baseName()
         self._notes = blueprintData.get('notes', None)
@@ -119,6 +124,10 @@ class BlueprintTreeItem(QtWidgets.QTreeWidgetItem):
         if self.isValid():
             # column 0
             self.setText(0, self._name)
+            if self._entry is not None:
+                self.setToolTip(0, '{0} blocks, {1} KB, modified {2}'.format(
+                    self._entry['blocks'], int(round(self._entry['size'] / 1024.0)),
+                    time.strftime('%Y-%m-%d %H:%M', time.localtime(self._entry['mtime']))))
 
             # column 1
             self.setText(1, self._notes)
@@ -187,14 +196,9 @@ class BaseSaveLoadDialog(QtWidgets.QDialog):
         if not baseDir.exists():
             return
 
-        for eachFile in baseDir.listdir():
-            if not eachFile.endswith(BLUEPRINT_EXTENSION):
-                continue
-
-            try:
-                newItem = BlueprintTreeItem(eachFile)
-            except ValueError:
-                continue
+        # the catalog only reparses blueprints changed since the last listing.
+        for entry in Catalog(baseDir).refresh():
+            newItem = BlueprintTreeItem(baseDir / entry['name'], entry=entry)
             if newItem.isValid():
                 self.blueprintTreeWidget.addTopLevelItem(newItem)
                 self.blueprintTreeWidget.setItemWidget(newItem, 2, newItem.deleteButton)
@@ -0,0 +1,93 @@
+import unittest
+
+from brick import base
+
+
+def makeBuilder(names):
+    builder = base.GenericBuilder()
+    for name in names:
+        block = base.Generic()
+        block.name = name
+        builder.insertBlock(block)
+    return builder
+
+
+class BlockListIndexTest(unittest.TestCase):
+    def assertIndexed(self, blocks):
+        for block in blocks:
+            self.assertIs(blocks.getByName(block.name), block)
+            self.assertIs(blocks.getByUuid(block.uuid), block)
+            self.assertIn(block, blocks)
+
+    def test_rename(self):
+        builder = makeBuilder(['a', 'b'])
+        block = builder.blocks[0]
+        block.name = 'c'
+
+        self.assertFalse(builder.blocks.hasName('a'))
+        self.assertIs(builder.blocks.getByName('c'), block)
+        self.assertIndexed(builder.blocks)
+
+    def test_uuidChange(self):
+        builder = makeBuilder(['a', 'b'])
+        block = builder.blocks[1]
+        oldUuid = block.uuid
+        block.new_uuid()
+
+        self.assertIsNone(builder.blocks.getByUuid(oldUuid))
+        self.assertIs(builder.blocks.getByUuid(block.uuid), block)
+        self.assertIndexed(builder.blocks)
+
+    def test_reorder(self):
+        builder = makeBuilder(['a', 'b', 'c'])
+        builder.blocks.reorder(['c', 'a'])
+
+        self.assertEqual(builder.blocks.names(), ['c', 'a'])
+        self.assertIsNone(builder.blocks.getByName('b'))
+        self.assertIndexed(builder.blocks)
+
+    def test_duplicateNames(self):
+        builder = makeBuilder(['a', 'b', 'a'])
+        first, second = builder.blocks[0], builder.blocks[2]
+
+        self.assertIs(builder.blocks.getByName('a'), first)
+        builder.blocks.remove(first)
+        self.assertIs(builder.blocks.getByName('a'), second)
+        builder.blocks.remove(second)
+        self.assertFalse(builder.blocks.hasName('a'))
+
+    def test_pop(self):
+        builder = makeBuilder(['a', 'b', 'c'])
+        block = builder.blocks.pop(1)
+
+        self.assertEqual(builder.blocks.names(), ['a', 'c'])
+        self.assertNotIn(block, builder.blocks)
+        self.assertIsNone(builder.blocks.getByUuid(block.uuid))
+        self.assertIndexed(builder.blocks)
+
+
+class UniqueNameTest(unittest.TestCase):
+    def test_firstFreeName(self):
+        builder = base.GenericBuilder()
+        for _ in range(5):
+            builder.insertBlock(builder.createBlock('ScriptBlock'))
+        self.assertEqual(builder.blocks.names(),
+                         ['ScriptBlock', 'ScriptBlock1', 'ScriptBlock2', 'ScriptBlock3', 'ScriptBlock4'])
+
+        builder.blocks.remove(builder.blocks.getByName('ScriptBlock3'))
+        builder.blocks.getByName('ScriptBlock1').name = 'renamed'
+        self.assertEqual(builder.getNextUniqueName('ScriptBlock'), 'ScriptBlock1')
+        builder.insertBlock(builder.createBlock('ScriptBlock'))
+        self.assertEqual(builder.getNextUniqueName('ScriptBlock'), 'ScriptBlock3')
+        builder.insertBlock(builder.createBlock('ScriptBlock'))
+        self.assertEqual(builder.getNextUniqueName('ScriptBlock'), 'ScriptBlock5')
+
+    def test_takenOutOfOrder(self):
+        builder = makeBuilder(['block', 'block2'])
+        self.assertEqual(builder.getNextUniqueName(), 'block1')
+        builder.blocks[1].name = 'block1'
+        self.assertEqual(builder.getNextUniqueName(), 'block2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from brick import base, attr_type
+from brick.constants import BuildStatus
+from brick.executors import ThreadExecutor
+from brick.lib.checkpoint import Checkpoint
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.blueprintPath = os.path.join(self.tempDir, 'build.bpt')
+        self.flagPath = os.path.join(self.tempDir, 'pass')
+        self.checkpointPath = self.blueprintPath + '.ckpt'
+
+        builder = base.GenericBuilder()
+        for name, script, attrs in (
+                ('a', 'x = 1', {'label': (attr_type.String, 'first')}),
+                ('b', 'y = v + 1', {'v': (attr_type.Input, ('a', 'x'))}),
+                ('c', 'import os\nif not os.path.exists({0!r}): raise RuntimeError("fail")\nz = 1'.format(
+                    self.flagPath), {}),
+                ('d', 'w = v * 3', {'v': (attr_type.Input, ('b', 'y'))})):
+            block = builder.createBlock('ScriptBlock')
+            block.name = name
+            block.setAttr('script', (attr_type.Script, script))
+            for key, typeVal in attrs.items():
+                block.setAttr(key, typeVal)
+            builder.insertBlock(block)
+        builder.saveBlueprint(self.blueprintPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+
+    def runUntilFailure(self):
+        builder = base.GenericBuilder.loadBlueprint(self.blueprintPath)
+        builder.enableCheckpoint()
+        builder.fastForward()
+        self.assertEqual(builder.blocks.getByName('c').buildStatus, BuildStatus.fail)
+        return builder
+
+    def statuses(self, builder):
+        return [block.buildStatus for block in builder.blocks]
+
+    def test_resumeAfterFailure(self):
+        self.runUntilFailure()
+        open(self.flagPath, 'w').close()
+
+        builder = base.GenericBuilder.loadBlueprint(self.blueprintPath)
+        builder.resume()
+
+        blockA = builder.blocks.getByName('a')
+        self.assertEqual(blockA.x, 1)
+        self.assertEqual(blockA.getLocalRunTimeAttrs()['label'], 'first')
+        self.assertEqual(builder.blocks.getByName('d').w, 6)
+        self.assertEqual(self.statuses(builder), [BuildStatus.success] * 4)
+
+    def test_resumeWithDagExecutor(self):
+        self.runUntilFailure()
+        open(self.flagPath, 'w').close()
+
+        builder = base.GenericBuilder.loadBlueprint(self.blueprintPath)
+        builder.resume(executor=ThreadExecutor(maxWorkers=2))
+
+        self.assertEqual(builder.blocks.getByName('d').w, 6)
+        self.assertEqual(self.statuses(builder), [BuildStatus.success] * 4)
+        self.assertEqual(len(Checkpoint.read(self.checkpointPath).finishedBlocks()), 4)
+
+    def test_truncatedLastRecord(self):
+        builder = self.runUntilFailure()
+        finished = [block.uuid for block in builder.blocks if block.buildStatus == BuildStatus.success]
+        with open(self.checkpointPath, 'r+b') as fd:
+            fd.truncate(os.path.getsize(self.checkpointPath) - 10)
+
+        checkpoint = Checkpoint.read(self.checkpointPath)
+        self.assertEqual(list(checkpoint.finishedBlocks()), finished[:-1])
+
+        checkpoint.addBlock(builder.blocks.getByName('d'), 4)
+        checkpoint = Checkpoint.read(self.checkpointPath)
+        self.assertEqual(list(checkpoint.finishedBlocks()), finished[:-1] + [builder.blocks.getByName('d').uuid])
+        self.assertEqual(checkpoint.nextStep, 4)
+
+    def test_resetRemovesFile(self):
+        builder = self.runUntilFailure()
+        self.assertTrue(os.path.exists(self.checkpointPath))
+
+        builder.reset()
+        self.assertFalse(os.path.exists(self.checkpointPath))
+
+
+if __name__ == '__main__':
+    unittest.main()
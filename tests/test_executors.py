@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+
+from brick import base, attr_type
+from brick.constants import BuildStatus
+from brick.executors import DependencyGraph, ThreadExecutor
+from brick.aio import AsyncDependencyGraph, AsyncExecutor
+
+
+class Recorder(base.Generic):
+    fixedAttrs = ()
+    order = []
+    orderLock = threading.Lock()
+    delay = 0.0
+
+    def _execute(self):
+        time.sleep(self.delay)
+        self.value = 1
+        with self.orderLock:
+            self.order.append(self.name)
+
+
+class Slow(Recorder):
+    delay = 0.3
+
+
+def makeBuilder(specs):
+    builder = base.GenericBuilder()
+    for blockCls, name, inputName in specs:
+        block = blockCls()
+        block.name = name
+        if inputName:
+            block.setAttr('v', (attr_type.Input, (inputName, 'value')))
+        builder.insertBlock(block)
+    return builder
+
+
+class DependencyOrderTest(unittest.TestCase):
+    def setUp(self):
+        del Recorder.order[:]
+
+    def test_blockWithoutInputsWaitsForAllEarlierBlocks(self):
+        builder = makeBuilder([(Recorder, 'X', None), (Slow, 'A', None), (Recorder, 'B', 'X'),
+                               (Recorder, 'C', None)])
+
+        graph = DependencyGraph(builder.blocks)
+        self.assertEqual(graph.upstream, [set(), {0}, {0}, {1, 2}])
+
+        builder.fastForward(ThreadExecutor(maxWorkers=4))
+        self.assertEqual(Recorder.order.index('C'), 3)
+        self.assertTrue(all(block.buildStatus == BuildStatus.success for block in builder.blocks))
+
+    def test_synchronousBlocksWithInputsStayInOrder(self):
+        builder = makeBuilder([(Recorder, 'S0', None), (Recorder, 'S1', None), (Slow, 'S2', 'S0'),
+                               (Recorder, 'S3', None)])
+
+        graph = AsyncDependencyGraph(builder.blocks)
+        self.assertEqual(graph.upstream, [set(), {0}, {0, 1}, {2}])
+
+        builder.fastForward(AsyncExecutor(maxWorkers=2))
+        self.assertEqual(Recorder.order, ['S0', 'S1', 'S2', 'S3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
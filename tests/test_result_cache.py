@@ -0,0 +1,48 @@
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from brick import base, attr_type
+from brick.constants import BuildStatus
+from brick.lib.result_cache import ResultCache
+
+
+def makeBuilder():
+    builder = base.GenericBuilder()
+    for name, script, inputs in (('a', 'import math\nx = math.floor(2.5)', {}),
+                                 ('b', 'y = v + 1', {'v': ('a', 'x')})):
+        block = builder.createBlock('ScriptBlock')
+        block.name = name
+        block.setAttr('script', (attr_type.Script, script))
+        for key, val in inputs.items():
+            block.setAttr(key, (attr_type.Input, val))
+        builder.insertBlock(block)
+    return builder
+
+
+class ScriptBlockCacheTest(unittest.TestCase):
+    def test_outputsAreOnlyScriptNames(self):
+        builder = makeBuilder()
+        builder.fastForward()
+        self.assertEqual(builder.blocks[0].getOutputs(), {'x': 2})
+        self.assertEqual(builder.blocks[1].getOutputs(), {'y': 3})
+
+    def test_unchangedChainIsRestoredFromCache(self):
+        builder = makeBuilder()
+        builder.resultCache = ResultCache()
+        builder.fastForward()
+
+        builder.reset()
+        # blocks are created from the registered class, patch that one.
+        with mock.patch.object(type(builder.blocks[0]), '_execute', side_effect=AssertionError("block executed")):
+            builder.fastForward()
+
+        self.assertEqual([block.buildStatus for block in builder.blocks], [BuildStatus.success] * 2)
+        self.assertEqual(builder.blocks[1].y, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()